@@ -0,0 +1,157 @@
+import argparse
+import datetime
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Color:
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    GREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+
+class MockSdk:
+    def __init__(self, args):
+        self.latency: float = args.latency / 1000  # Seconds
+        self.jitter: float = args.jitter / 1000  # Seconds
+        self.errorRate: float = args.error_rate  # Share of /alpr requests answered with an error
+        self.errorStatus: int = args.error_status
+        self.maxCalls: int = args.max_calls
+        self.license: str = args.license
+        self.verbose: bool = args.verbose
+        self.script: list = load_script(args.results, args.plate)  # Responses are returned in turn
+        self.calls: int = 0
+        self.errors: int = 0
+        self.lock = threading.Lock()
+
+    def next_response(self) -> (int, dict, float):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+            response = self.script[(calls - 1) % len(self.script)]
+            error = random.random() < self.errorRate
+            if error:
+                self.errors += 1
+        delay = max(self.latency + random.uniform(-self.jitter, self.jitter), 0.0)
+        if error:
+            return self.errorStatus, {'detail': 'Mock SDK error'}, delay
+        if 0 < self.maxCalls < calls:
+            return 403, {'detail': 'Maximum number of calls reached'}, delay
+
+        response = json.loads(json.dumps(response))  # Copy before filling in the request fields
+        response['usage'] = {'calls': calls, 'max_calls': self.maxCalls}
+        response['processing_time'] = round(delay * 1000, 3)
+        return 200, response, delay
+
+
+def parse_arguments():
+    ap = argparse.ArgumentParser(description='Mock Platerecognizer SDK',
+                                 epilog='Start application as: python mocksdk.py --port 8100 --latency 50 --jitter 20 --error-rate 0.01')
+    ap.add_argument('-p', '--port', type=int, action='store', default=8100, help='Port number. Default 8100.', required=False)
+    ap.add_argument('-r', '--results', type=str, action='store', help='JSON file with one response or a list of responses returned in turn.',
+                    required=False)
+    ap.add_argument('--plate', type=str, action='store', default='ab12345', help='Plate in the default response. Empty for no plate.',
+                    required=False)
+    ap.add_argument('--latency', type=float, action='store', default=50.0, help='Response time in milliseconds.', required=False)
+    ap.add_argument('--jitter', type=float, action='store', default=0.0, help='Random +/- variation of the response time in milliseconds.',
+                    required=False)
+    ap.add_argument('--error-rate', type=float, action='store', default=0.0, help='Share of requests answered with an error (0.0-1.0).',
+                    required=False)
+    ap.add_argument('--error-status', type=int, action='store', default=500, help='HTTP status code of error responses.', required=False)
+    ap.add_argument('--max-calls', type=int, action='store', default=0, help='Calls before status 403 is returned. 0=no limit.', required=False)
+    ap.add_argument('-l', '--license', type=str, action='store', default='MOCK', help='License key returned by /info/.', required=False)
+    ap.add_argument('-v', '--verbose', action='store_true', help='Print every request.', required=False)
+
+    return ap.parse_args()
+
+
+def default_response(plate: str) -> dict:
+    results = []
+    if not plate == '':
+        results.append({'box': {'xmin': 400, 'ymin': 300, 'xmax': 520, 'ymax': 340}, 'plate': plate, 'region': {'code': 'no', 'score': 0.9},
+                        'score': 0.9, 'candidates': [{'score': 0.9, 'plate': plate}], 'dscore': 0.9,
+                        'vehicle': {'score': 0.8, 'type': 'Sedan', 'box': {'xmin': 250, 'ymin': 100, 'xmax': 700, 'ymax': 450}}})
+    return {'filename': '', 'timestamp': '', 'camera_id': '', 'results': results, 'usage': None, 'processing_time': 0.0}
+
+
+def load_script(filename: str, plate: str) -> list:
+    if filename is None:
+        return [default_response(plate)]
+    with open(filename, 'r') as f:
+        script = json.load(f)
+    return script if isinstance(script, list) and len(script) > 0 else [script]
+
+
+def form_field(body: bytes, name: str) -> str:
+    match = re.search(rb'name="' + name.encode() + rb'"\r\n\r\n([^\r]*)\r\n', body)  # Multipart form field
+    return '' if match is None else match.group(1).decode(errors='replace')
+
+
+def make_handler(sdk: MockSdk):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive like the SDK
+
+        def send_json(self, status: int, value: dict):
+            body = json.dumps(value).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/info':
+                self.send_json(200, {'version': 'mock', 'license_key': sdk.license, 'total_calls': sdk.calls, 'usage': {'calls': sdk.calls}})
+            else:
+                self.send_json(404, {'detail': 'Not found'})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if not self.path.rstrip('/') == '/alpr':
+                self.send_json(404, {'detail': 'Not found'})
+                return
+
+            status, response, delay = sdk.next_response()
+            time.sleep(delay)
+            if status == 200:
+                response['filename'] = f'{time.strftime("%H%M")}_{uuid.uuid4().hex[0:8]}_upload.jpg'
+                response['timestamp'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')  # Format parsed by yolocam
+                response['camera_id'] = form_field(body, 'camera_id')
+            try:
+                self.send_json(status, response)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client cancelled the request
+
+        def log_message(self, format, *args):
+            if sdk.verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    sdk = MockSdk(args)
+    server = ThreadingHTTPServer(('0.0.0.0', args.port), make_handler(sdk))
+    server.daemon_threads = True
+    print('---------------------------------------------1.0-')
+    print(f'{Color.GREEN}Mock Platerecognizer SDK on port {args.port}{Color.ENDC}')
+    print(f'Latency={args.latency}ms +/-{args.jitter}ms. Error rate={args.error_rate}. Responses={len(sdk.script)}')
+    print(f'Run yolocam with: --address 127.0.0.1:{args.port} --mock-sdk')
+    print('-------------------------------------------------')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    print(f'Calls={sdk.calls}. Errors={sdk.errors}')
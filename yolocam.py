@@ -3,9 +3,11 @@ import asyncio
 import copy
 import ftplib
 import glob
+import heapq
 import math
 import pickle
 import platform
+import random
 import re as regx
 import signal
 import socket
@@ -22,7 +24,7 @@ import requests
 import requests.auth
 import urllib3
 import websockets
-from PIL import Image
+import aiohttp
 from netaddr import IPNetwork
 from pykson import Pykson
 import smtplib
@@ -37,6 +39,9 @@ from yolocls import *
 SDK_ADDRESS = '0.0.0.0:8100'  # SDK address
 SDK_TOKEN = ''  # SDK token
 SDK_LICENSE = ''  # SDK license key
+SDK_EXTERNAL = False  # SDK is not the local platerecognizer/alpr container, e.g. mocksdk.py. Docker is not checked
+SDK = SdkClient(size=8)  # Pooled keep-alive HTTP client for the SDK
+BREAKER = CircuitBreaker()  # Stops SDK requests while the SDK fails or is too slow. Shared by all lanes, set by yolocam.ini (CAM_PARAMS.lpr)
 DEV_PARAMS = DeviceParameters()  # Device object
 CAM_PARAMS = CameraParameters()  # Camera object
 BOARD = GHF51()  # GHF51 board I/O interface
@@ -45,16 +50,14 @@ DIO = IoPin()  # GPIO pin configuration
 GYRO = BNO055()  # Gyroscope
 LOG_WRITES = []  # Log message file write buffer
 LOG_MESSAGES = []  # Log message buffer
-TRIGGERS = []  # Thread locks to trigger plate recognition
+LANES = []  # Camera lanes. Lane 0 is configured by yolocam.ini, lane n by yolocam_n.ini
 DECISIONS = []  # Decision buffer
-READINGS = []  # Readings buffer
-PLATES = {}  # Accepted plate buffer {plate, count}
-IGNORED = {}  # Ignored plate buffer {plate, expired}
-DIRECTIONS = {}  # Direction control {plate, {x, y, timestamp}
 INFERENCE_BUFFER = []  # Statistics buffer for recognition time
-FRAME_BUFFER = []  # Statistics buffer for frame size
-POST_BUFFER = []  # Video buffer for frames after a decision is made
-VIDEO_BUFFER = []  # Video buffer to record live decision
+CAPTURE_LOCK = thread.allocate_lock()  # FFmpeg capture options are process wide - set and open one capture at a time
+MAX_INFLIGHT_REQUESTS = 8  # Max. concurrent SDK requests for each lane
+RECOGNITION_LOOP = None  # Event loop running the plate recognition of all lanes
+MOSAIC_QUEUE = []  # Frames waiting to be packed into a mosaic {lane, frame, future}
+MOSAIC_WIDTH = 1920  # Max. width of a mosaic image
 EXCEL_BUFFER = []  # Temporary buffer for decisions to be saved to Excel file
 EXCEL_BUSY = False  # Writing to excel file is busy
 BLACKLIST = []  # List of plates that are blacklisted
@@ -65,19 +68,27 @@ WATCHDOG = 0  # Watchdog for socket communication
 NEW_PLATE = False  # Flag indicating a new plate recognition
 INIT = False  # Device is initialized
 STARTED = True  # Application running flag
+DECISION_SETTLE_TIME = 0.25  # Seconds without a new reading of a plate before a free flow decision is made
+DIRECTION_POINT_AGE = 60.0  # Seconds a direction point is kept
+BRIGHTNESS_LIMITS = np.array([0.0, 0.03, 0.061, 0.091, 0.121, 0.152, 0.182, 0.212, 0.242, 0.273, 0.303, 0.333, 0.364, 0.394, 0.424, 0.455, 0.485,
+                              0.515, 0.545, 0.576, 0.606, 0.636, 0.667, 0.697, 0.727, 0.758, 0.788, 0.818, 0.848, 0.879, 0.909, 0.939, 0.97])  # Lower level limits
+BRIGHTNESS_LEVELS = np.array([64, 60, 56, 52, 48, 44, 40, 36, 32, 28, 24, 20, 16, 12, 8, 4, 0,
+                              -4, -8, -12, -16, -20, -24, -28, -32, -36, -40, -44, -48, -52, -56, -60, -64])  # Camera brightness for each level
 ASCII = {'<NUL>': 0, '<SOH>': 1, '<STX>': 2, '<ETX>': 3, '<EOT>': 4, '<ENQ>': 5, '<ACK>': 6, '<BEL>': 7, '<BS>': 8, '<HT>': 9, '<LF>': 10, '<VT>': 11, '<FF>': 12, '<CR>': 13,
          '<SO>': 14, '<SI>': 15, '<DLE>': 16, '<DC1>': 17, '<DC2>': 18, '<DC3>': 19, '<DC4>': 20, '<NAK>': 21, '<SYN>': 22, '<ETB>': 23, '<CAN>': 24, '<EM>': 25, '<SUB>': 26,
          '<ESC>': 27, '<FS>': 28, '<GS>': 29, '<RS>': 30, '<US>': 31, '<DEL>': 127}
 
 
 def parse_arguments() -> None:
-    global SDK_TOKEN, SDK_LICENSE, SDK_ADDRESS
+    global SDK_TOKEN, SDK_LICENSE, SDK_ADDRESS, SDK_EXTERNAL
 
     ap = argparse.ArgumentParser(description='YOLOCAM License Plate Reader',
                                  epilog='Start application as: python yolocam.py --token f9a70edb707a6cd1f91175506de4b2abc3cb73e3 --license 6GFwyXUp9U --address 127.0.0.1:8100')
     ap.add_argument('-t', '--token', type=str, action='store', help='SDK token.', required=True)
     ap.add_argument('-l', '--license', type=str, action='store', help='SDK license key.', required=False)
     ap.add_argument('-a', '--address', type=str, action='store', help='SDK engine address and port number.', required=False)
+    ap.add_argument('-m', '--mock-sdk', action='store_true', help='SDK at --address is not run by Docker, e.g. mocksdk.py. Docker checks are skipped.',
+                    required=False)
 
     args = ap.parse_args()
     if args.license:
@@ -86,6 +97,7 @@ def parse_arguments() -> None:
         SDK_TOKEN = args.token
     if args.address:
         SDK_ADDRESS = args.address
+    SDK_EXTERNAL = args.mock_sdk
 
 
 def signal_handling(signum, frame) -> None:
@@ -157,19 +169,10 @@ def decisions_to_str() -> str:
     return str(buf)
 
 
-def load_test_image() -> None:
-    global FRAME_BUFFER
-
-    print('load_test_image()')
-    p = np.fromfile('CP29179-1.jpg', dtype=np.uint8)
-    platerecognizer_recognize(p)
-    FRAME_BUFFER[0] = p
-
-
 def create_folders() -> None:
     try:
         if platform.system() == 'Linux':
-            for folder in ['logs', 'decisions', 'excel', 'flushed', 'post', 'ftp', 'tcp', 'videos', 'lists', 'email']:
+            for folder in ['logs', 'decisions', 'excel', 'flushed', 'post', 'ftp', 'tcp', 'videos', 'lists', 'email', 'replay']:
                 if not os.path.exists(folder):
                     os.mkdir(folder)
                 os.chmod(f'/home/cam/{folder}', 0o777)
@@ -337,8 +340,33 @@ def save_dev_parameters() -> None:
         log(LogType.ERROR, 'save_dev_parameters', e)
 
 
+def parse_cam_parameters(value: str) -> CameraParameters:
+    params = Pykson().from_json(value, CameraParameters, accept_unknown=True)
+    if params.camera is None:
+        params.camera = Camera()
+    if params.lpr is None:
+        params.lpr = Lpr()
+    if params.videoStream is None:
+        params.videoStream = VideoStream()
+    if params.auxiliary is None:
+        params.auxiliary = Auxiliary()
+    if params.firmware is None:
+        params.firmware = Firmware()
+    if params.monitor is None:
+        params.monitor = Monitor()
+
+    if params.lpr.deviceInterface is None:
+        params.lpr.deviceInterface = DeviceInterface()
+    if params.lpr.decisionRecording is None:
+        params.lpr.decisionRecording = DecisionRecording()
+        params.lpr.decisionRecording.size = Size()
+    if params.lpr.options is None:
+        params.lpr.options = LprOptions()
+    return params
+
+
 def load_cam_parameters() -> str:
-    global CAM_PARAMS
+    global CAM_PARAMS, LANES
 
     try:
         file = get_work_dir('yolocam.ini')
@@ -346,29 +374,11 @@ def load_cam_parameters() -> str:
             with open(file, 'r') as f:
                 cam = CAM_PARAMS.camera
                 value = f.read()
-                CAM_PARAMS = Pykson().from_json(value, CameraParameters, accept_unknown=True)
-                if CAM_PARAMS.camera is None:
-                    CAM_PARAMS.camera = Camera()
-                if CAM_PARAMS.lpr is None:
-                    CAM_PARAMS.lpr = Lpr()
-                if CAM_PARAMS.videoStream is None:
-                    CAM_PARAMS.videoStream = VideoStream()
-                if CAM_PARAMS.auxiliary is None:
-                    CAM_PARAMS.auxiliary = Auxiliary()
-                if CAM_PARAMS.firmware is None:
-                    CAM_PARAMS.firmware = Firmware()
-                if CAM_PARAMS.monitor is None:
-                    CAM_PARAMS.monitor = Monitor()
-
-                if CAM_PARAMS.lpr.deviceInterface is None:
-                    CAM_PARAMS.lpr.deviceInterface = DeviceInterface()
-                if CAM_PARAMS.lpr.decisionRecording is None:
-                    CAM_PARAMS.lpr.decisionRecording = DecisionRecording()
-                    CAM_PARAMS.lpr.decisionRecording.size = Size()
-                if CAM_PARAMS.lpr.options is None:
-                    CAM_PARAMS.lpr.options = LprOptions()
-
+                CAM_PARAMS = parse_cam_parameters(value)
                 CAM_PARAMS.camera.changed = not CAM_PARAMS.camera.__eq__(cam)
+                if len(LANES) > 0:
+                    LANES[0].params = CAM_PARAMS  # Lane 0 follows yolocam.ini
+                share_device_parameters()
                 return value
         else:
             return ''
@@ -376,6 +386,82 @@ def load_cam_parameters() -> str:
         log(LogType.ERROR, 'load_cam_parameters', e)
 
 
+def load_lane_parameters(index: int) -> str:
+    global CAM_PARAMS, LANES
+
+    try:
+        file = get_work_dir(f'yolocam_{index}.ini')
+        if os.path.isfile(file):
+            with open(file, 'r') as f:
+                value = f.read()
+                params = parse_cam_parameters(value)
+                share_device_parameters(params)
+
+                if index < len(LANES):
+                    params.camera.changed = not params.camera.__eq__(LANES[index].params.camera)
+                    LANES[index].params = params
+                else:
+                    LANES.append(Lane(index, params))
+                return value
+        else:
+            return ''
+    except Exception as e:
+        log(LogType.ERROR, 'load_lane_parameters', e)
+
+
+def read_lane_parameters(index: int) -> str:
+    try:
+        file = get_work_dir('yolocam.ini' if index == 0 else f'yolocam_{index}.ini')
+        if os.path.isfile(file):
+            with open(file, 'r') as f:
+                return f.read()  # File text only - the running lanes are not changed
+        else:
+            return ''
+    except Exception as e:
+        log(LogType.ERROR, 'read_lane_parameters', e)
+        return ''
+
+
+def share_device_parameters(params=None) -> None:
+    global CAM_PARAMS, LANES
+
+    for p in [params] if params is not None else [lane.params for lane in LANES[1:]]:
+        p.videoStream = CAM_PARAMS.videoStream  # Device settings are shared by all lanes
+        p.auxiliary = CAM_PARAMS.auxiliary
+        p.firmware = CAM_PARAMS.firmware
+        p.monitor = CAM_PARAMS.monitor
+        p.lpr.deviceInterface = CAM_PARAMS.lpr.deviceInterface
+
+
+def save_lane_parameters(index: int, value: str) -> None:
+    try:
+        with open(get_work_dir(f'yolocam_{index}.ini'), 'w') as f:
+            f.write(value)
+    except Exception as e:
+        log(LogType.ERROR, 'save_lane_parameters', e)
+
+
+def load_lanes() -> None:
+    global CAM_PARAMS, LANES
+
+    LANES = [Lane(0, CAM_PARAMS)]
+    while os.path.isfile(get_work_dir(f'yolocam_{len(LANES)}.ini')):
+        index = len(LANES)
+        load_lane_parameters(index)
+        if len(LANES) == index:
+            break  # Lane parameters could not be loaded
+        log(LogType.DEBUG, 'load_lanes', f'LANE {index}: [{LANES[index].params.camera.address}] loaded')
+
+
+def get_lane(index: int) -> Lane:
+    global LANES
+
+    if 0 <= index < len(LANES):
+        return LANES[index]
+    else:
+        return LANES[0]
+
+
 def save_cam_parameters() -> None:
     global CAM_PARAMS
 
@@ -648,29 +734,25 @@ def remove_decision_recordings(days: int) -> None:
             remove_file(f)
 
 
-def include_full_image():
-    global CAM_PARAMS
-
-    if is_numeric(CAM_PARAMS.lpr.includeFullImage):
-        return True, int(CAM_PARAMS.lpr.includeFullImage)
+def include_full_image(lane: Lane):
+    if is_numeric(lane.params.lpr.includeFullImage):
+        return True, int(lane.params.lpr.includeFullImage)
     else:
         return False, 0
 
 
-def save_decision_recording(id: str, text: str) -> None:
-    global VIDEO_BUFFER, CAM_PARAMS
-
+def save_decision_recording(lane: Lane, id: str, text: str) -> None:
     def __save_video(_id: str, _text: str):
         try:
             sleep(1.0)  # Add an extra second to the video
             file = get_work_dir(f'videos/{_id}.avi')
-            width, height = [CAM_PARAMS.lpr.decisionRecording.size.width, CAM_PARAMS.lpr.decisionRecording.size.height]
+            width, height = [lane.params.lpr.decisionRecording.size.width, lane.params.lpr.decisionRecording.size.height]
             if width == 0 or height == 0:
-                height, width = VIDEO_BUFFER[0].shape[0:2]  # Set original video resolution, if size is 0; 0
+                height, width = lane.videoBuffer[0].shape[0:2]  # Set original video resolution, if size is 0; 0
 
             out = cv2.VideoWriter(file, cv2.VideoWriter_fourcc('X', 'V', 'I', 'D'), 25.0, (width, height))
-            for frame in copy.deepcopy(VIDEO_BUFFER):
-                if CAM_PARAMS.lpr.decisionRecording.infoText:
+            for frame in copy.deepcopy(lane.videoBuffer):
+                if lane.params.lpr.decisionRecording.infoText:
                     cv2.putText(frame, _text, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
                 out.write(cv2.resize(frame, (width, height)))
             out.release()
@@ -739,10 +821,10 @@ def get_flushed_decision() -> None:
 
 
 def append_decision(value: dict) -> None:
-    global DECISIONS, POST_BUFFER
+    global DECISIONS
 
     DECISIONS.append(value)  # Append new decision
-    POST_BUFFER.clear()
+    get_lane(value.get('lane', 0)).postBuffer.clear()
     value['index'] = max(DECISIONS.copy(), key=lambda x: x['index']).get('index') + 1  # Get next index value
     log(LogType.DEBUG, 'append_decision', f'DECISION [{value["data"].plate}] ({value["index"]}) appended', decisions_to_str())
 
@@ -756,72 +838,68 @@ def delete_decision(index: int) -> None:
             break
 
 
-def find_decision(plate: str) -> (bool, any):
+def find_decision(lane: Lane, plate: str) -> (bool, any):
     for decision in DECISIONS.copy():  # Test if plate exists in DECISIONS
-        if decision['data'].plate == plate and bool(decision['pending']):
+        if bool(decision['pending']) and decision['result'].plate == plate and decision.get('lane', 0) == lane.index:
             return True, decision
     return False, None
 
 
-def finalize_decision(reading: PlateReaderResult) -> None:
-    global CAM_PARAMS, DEV_PARAMS, DIRECTIONS, IGNORED, PLATES, IGNORELIST
+def finalize_decision(lane: Lane, reading: PlateReaderResult) -> None:
+    global CAM_PARAMS, DEV_PARAMS, IGNORELIST, DIRECTION_POINT_AGE
 
     for re in reading.results:
         re.plate = re.plate.upper()
         ts = datetime.strptime(re.timestamp, '%Y-%m-%d %H:%M:%S.%f').timestamp()
-        if re.plate not in DIRECTIONS:  # Add direction tracker for plate
-            DIRECTIONS[re.plate] = dict(x=[re.box.xMin], y=[re.box.yMin], ts=[ts])
+        track = lane.directions.get(re.plate)
+        if track is None:  # Add direction tracker for plate
+            track = lane.directions[re.plate] = Track()
+            schedule_timer(lane, time.monotonic() + DIRECTION_POINT_AGE, 'direction', re.plate, track)
         else:
-            DIRECTIONS[re.plate]['x'].append(re.box.xMin)  # Plate's x position
-            DIRECTIONS[re.plate]['y'].append(re.box.yMin)  # Plate's y position
-            DIRECTIONS[re.plate]['ts'].append(ts)  # Plate's timestamp
-
-    for plate, direction in DIRECTIONS.copy().items():  # Test if plate is still visible in the camera view
-        visible = False
-        pending, decision = find_decision(plate)  # Find a pending decision
-        for re in reading.results:
-            if re.plate == plate:
-                visible = True  # Plate is still visible in the camera view
+            track.trim(ts - DIRECTION_POINT_AGE)  # Delete points that are older than the newest point - 60 seconds
+        track.append(re.box.xMin, re.box.yMin, ts)  # Plate's position and timestamp
+        track.seen = time.monotonic()  # Time the plate was last seen
 
-        if (not visible or CAM_PARAMS.lpr.decisionModel == DecisionModel.ACCESS_CONTROL.value) and pending:
-            points = []
-            for i in range(len(direction['x'])):  # Build a list of points and timestamps to calculate the direction
-                x, y, ts = direction['x'][i], direction['y'][i], direction['ts'][i]
-                if len([x1 for (x1, y1, ts1) in points if x == x1 and y == y1]) == 0:
-                    points.append(tuple((x, y, ts)))
+    plates = set(re.plate for re in reading.results)
+    for plate, direction in lane.directions.copy().items():  # Test if plate is still visible in the camera view
+        pending, decision = find_decision(lane, plate)  # Find a pending decision
+        visible = plate in plates  # Plate is still visible in the camera view
 
+        if (not visible or lane.params.lpr.decisionModel == DecisionModel.ACCESS_CONTROL.value) and pending:
+            xy, ts = track_points(direction)  # Points and timestamps to calculate the direction
             index, data, result = [decision['index'], decision['data'], decision['result']]
-            points = list(filter(lambda item: item[2] > points[-1][2] - 30, points))  # Filter points that are > 30 seconds old
-            data.direction = direction_lookup(plate, points)
-            data.speed = calculate_speed(plate, points)
+            data.direction = direction_lookup(lane, plate, xy, ts)
+            data.speed = calculate_speed(lane, plate, xy, ts)
 
-            if CAM_PARAMS.lpr.denyNumericDecision and plate.isnumeric():
+            if lane.params.lpr.denyNumericDecision and data.plate.isnumeric():
                 delete_decision(index)  # Remove decision when plate is numeric
-                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{plate}]. DECISION IGNORED WHEN NUMERIC')
+                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{data.plate}]. DECISION IGNORED WHEN NUMERIC')
 
             elif data.plate in IGNORELIST:
                 delete_decision(index)  # Remove decision when plate is ignored
-                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{plate}]. DECISION IGNORED BY IGNORELIST')
-
-            elif not allow_direction(data.direction):  # Test if direction is allowed
-                if plate in IGNORED:
-                    del IGNORED[plate]
-                if plate in PLATES:
-                    del PLATES[plate]
+                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{data.plate}]. DECISION IGNORED BY IGNORELIST')
+
+            elif not allow_direction(lane, data.direction):  # Test if direction is allowed
+                if plate in lane.ignored:
+                    del lane.ignored[plate]
+                lane.ignoredText.pop(plate, None)
+                if plate in lane.plates:
+                    del lane.plates[plate]
                 delete_decision(index)  # Remove decision when direction is not allowed
-                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{plate}]. <{data.direction}> DIRECTION IS NOT ALLOWED')
+                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{data.plate}]. <{data.direction}> DIRECTION IS NOT ALLOWED')
 
             else:
-                replace, candidate = find_candidate(data, CAM_PARAMS.lpr.useCandidates)
+                texts = decision.get('texts') or []  # Texts read for a box track, most votes first
+                replace, candidate = find_candidate(data, lane.params.lpr.useCandidates, [dict(plate=t) for t in texts] if len(texts) > 0 else None)
                 if replace:
+                    log(LogType.DEBUG, 'finalize_decision', f'Using candidate [{candidate}] instead of [{data.plate}]')
                     decision['data'].plate = candidate
-                    log(LogType.DEBUG, 'finalize_decision', f'Using candidate [{candidate}] instead of [{plate}]')
                 decision['pending'] = False  # Set decision to not pending
 
-                if CAM_PARAMS.lpr.decisionRecording.length > 0:
+                if lane.params.lpr.decisionRecording.length > 0:
                     ts = datetime.strptime(data.timestamp, '%Y-%m-%d %H:%M:%S.%f').isoformat(' ', 'seconds')
                     text = f'{data.address}: {ts}. [{data.plate}]'
-                    save_decision_recording(data.id, text)  # Save decision video recording
+                    save_decision_recording(lane, data.id, text)  # Save decision video recording
 
                 if CAM_PARAMS.lpr.deviceInterface.type == InterfaceType.WEB_HOOK.value:
                     save_post_decision(data.id, data.to_json())  # Save decision for posting to webhook
@@ -836,15 +914,18 @@ def finalize_decision(reading: PlateReaderResult) -> None:
                 if CAM_PARAMS.lpr.deviceInterface.type == InterfaceType.EXCEL.value:
                     add_excel(data)  # Add decision to Excel buffer
 
+                if lane.replay is not None:
+                    save_replay_decision(lane, data)  # Save decision to replay results
+
                 CAM_PARAMS.lpr.currentPlate = data.plate
 
                 if DEV_PARAMS.statistics.decisions >= sys.maxsize:
                     DEV_PARAMS.statistics.decisions = 0
                 DEV_PARAMS.statistics.decisions += 1
 
-                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{data.plate}]. <{data.direction}>', Pykson().to_json(result))
+                log(LogType.DECISION, 'finalize_decision', f'DECISION ({index}): [{data.plate}]. <{data.direction}>', json.dumps(dict(result.to_dict(), plate=data.plate)))
 
-            del DIRECTIONS[plate]
+            lane.directions.pop(plate, None)
             break
 
 
@@ -857,14 +938,24 @@ def save_decision(id: str, data: str) -> None:
         log(LogType.ERROR, 'save_decision', e)
 
 
+def save_replay_decision(lane: Lane, data: Decision) -> None:
+    try:
+        lane.replay.decisions += 1
+        with open(get_work_dir(f'replay/lane{lane.index}.csv'), 'a') as f:
+            f.write(f'{data.timestamp},{data.plate},{data.direction},{data.speed},{data.score},{data.dscore},{time.time() - lane.replay.started:.3f}\n')
+    except Exception as e:
+        log(LogType.ERROR, 'save_replay_decision', e)
+
+
 def get_decision(id: str) -> (bool, int, any):
-    global DECISIONS, POST_BUFFER, CAM_PARAMS
+    global DECISIONS, CAM_PARAMS
 
-    include, idx = include_full_image()
     for decision in DECISIONS.copy():
+        lane = get_lane(decision.get('lane', 0))
+        include, idx = include_full_image(lane)
         if not decision['pending'] and include and idx > 0 and decision['data'].fullImage is None:
-            if len(POST_BUFFER) >= idx:
-                frame = cv2.cvtColor(POST_BUFFER[idx - 1], cv2.COLOR_BGR2GRAY)
+            if len(lane.postBuffer) >= idx:
+                frame = cv2.cvtColor(lane.postBuffer[idx - 1], cv2.COLOR_BGR2GRAY)
                 _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
                 decision['data'].fullImage = b64encode(encoded.tobytes()).decode('ascii')
 
@@ -1254,79 +1345,73 @@ def get_log_messages(id: str) -> list:
     return buf
 
 
-def check_bounds(result: Result) -> (BoundsType, str):
-    global CAM_PARAMS
-
+def check_bounds(lane: Lane, result: Result) -> (BoundsType, str):
     w, h, x, y = [result.box.xMax - result.box.xMin, result.box.yMax - result.box.yMin, result.box.xMin, result.box.yMin]
 
-    if not (w < CAM_PARAMS.lpr.maxPlateSize.width and h < CAM_PARAMS.lpr.maxPlateSize.height):
+    if not (w < lane.params.lpr.maxPlateSize.width and h < lane.params.lpr.maxPlateSize.height):
         return BoundsType.PLATE_SIZE_MAX, f'x={x}, y={y}, width={w}, height={h}'  # The license plate size is larger than maximum
     else:
-        if not (w >= CAM_PARAMS.lpr.minPlateSize.width and h >= CAM_PARAMS.lpr.minPlateSize.height):
+        if not (w >= lane.params.lpr.minPlateSize.width and h >= lane.params.lpr.minPlateSize.height):
             return BoundsType.PLATE_SIZE_MIN, f'x={x}, y={y}, width={w}, height={h}'  # The license plate size is less than minimum
         else:
-            if result.score < CAM_PARAMS.lpr.minTextScore:
+            if result.score < lane.params.lpr.minTextScore:
                 return BoundsType.TEXT_SCORE_LOW, f'x={x}, y={y}, score={result.score}'  # The plate reader text score is too low
             else:
-                if result.dScore < CAM_PARAMS.lpr.minPlateScore:
+                if result.dScore < lane.params.lpr.minPlateScore:
                     return BoundsType.PLATE_SCORE_LOW, f'x={x}, y={y}, dscore={result.dScore}'  # The plate detection score is too low
                 else:
-                    if not (result.box.xMin > CAM_PARAMS.lpr.plateMargin.left):
-                        return BoundsType.PLATE_MARGIN_LEFT, f'x={x}, y={y}, left={CAM_PARAMS.lpr.plateMargin.left}'  # The license plate is not far enough to the left of the image
+                    if not (result.box.xMin > lane.params.lpr.plateMargin.left):
+                        return BoundsType.PLATE_MARGIN_LEFT, f'x={x}, y={y}, left={lane.params.lpr.plateMargin.left}'  # The license plate is not far enough to the left of the image
                     else:
-                        if not (result.box.yMin > CAM_PARAMS.lpr.plateMargin.top):
-                            return BoundsType.PLATE_MARGIN_TOP, f'x={x}, y={y}, top={CAM_PARAMS.lpr.plateMargin.top}'  # The license plate is not far enough down at the top of the image
+                        if not (result.box.yMin > lane.params.lpr.plateMargin.top):
+                            return BoundsType.PLATE_MARGIN_TOP, f'x={x}, y={y}, top={lane.params.lpr.plateMargin.top}'  # The license plate is not far enough down at the top of the image
                         else:
-                            if CAM_PARAMS.camera.mountingAngle == 0 or CAM_PARAMS.camera.mountingAngle == 180:
-                                w, h = [CAM_PARAMS.camera.resolution.width, CAM_PARAMS.camera.resolution.height]
+                            if lane.params.camera.mountingAngle == 0 or lane.params.camera.mountingAngle == 180:
+                                w, h = [lane.params.camera.resolution.width, lane.params.camera.resolution.height]
                             else:
-                                w, h = [CAM_PARAMS.camera.resolution.height, CAM_PARAMS.camera.resolution.width]
-                            if not ((w - result.box.xMax) > CAM_PARAMS.lpr.plateMargin.right):
+                                w, h = [lane.params.camera.resolution.height, lane.params.camera.resolution.width]
+                            if not ((w - result.box.xMax) > lane.params.lpr.plateMargin.right):
                                 return BoundsType.PLATE_MARGIN_RIGHT, f'x={x}, y={y}, right={w - result.box.xMax}'  # The license plate is too far to the right
                             else:
-                                if not ((h - result.box.yMax) > CAM_PARAMS.lpr.plateMargin.bottom):
+                                if not ((h - result.box.yMax) > lane.params.lpr.plateMargin.bottom):
                                     return BoundsType.PLATE_MARGIN_BOTTOM, f'x={x}, y={y}, bottom={h - result.box.yMax}'  # The license plate is too far down in the image
                                 else:
                                     return BoundsType.OK, ''  # Ok
 
 
-def direction_lookup(plate: str, points: list) -> str:
-    global CAM_PARAMS
+def track_points(track: Track) -> (any, any):
+    xy, ts = track.points()
+    key = xy[:, 0] * 4294967296 + (xy[:, 1] & 0xFFFFFFFF)
+    _, first = np.unique(key, return_index=True)
+    first.sort()  # First point of every position, in time order
+    xy, ts = xy[first], ts[first]
+    keep = ts > ts[-1] - 30  # Filter points that are > 30 seconds old
+    return xy[keep], ts[keep]
 
-    if len(points) < 2:
+
+def direction_lookup(lane: Lane, plate: str, xy: any, ts: any) -> str:
+    if len(ts) < 2:
         return 'unknown'
     else:
-        directions = ['up', 'left', 'left', 'left', 'down', 'right', 'right', 'right', 'up']
-        scores = dict(down=0, up=0, left=0, right=0)
-        buf = []
-        for i in range(len(points) - 1):  # Arrange points
-            p = list(points[i][:2])
-            p.extend(points[i + 1][:2])
-            buf.append(tuple(p))
-
-        for x1, y1, x2, y2 in buf:  # Calculate angels from points
-            deg = math.atan2(x1 - x2, y1 - y2) / math.pi * 180
-            if deg < 0:
-                deg = 360 + deg
-
-            heading = directions[round(deg / 45)]  # Calculate direction
-            scores[heading] += 1  # Increment score
-
-        best = sorted(scores.items(), reverse=True, key=lambda d: d[1])  # Sort the scores
-        direction = next(iter(best))[0]  # Get first direction of sorted scores
-
-        hX = buf[0][0] > buf[-1][2]  # Heading X: left=true, right=false
-        hY = buf[0][1] < buf[-1][3]  # Heading Y: down=true, up=false
-        dX = dY = 0
-        for i in range(len(buf)):  # Calculate pixel movement for X and Y
-            dX += buf[i][2] - buf[i][0]
-            dY += buf[i][3] - buf[i][1]
-
-        w, h = [CAM_PARAMS.camera.resolution.width, CAM_PARAMS.camera.resolution.height]
-        th = CAM_PARAMS.lpr.directionThreshold  # Left / right threshold percent
+        x1, y1, x2, y2 = [xy[:-1, 0], xy[:-1, 1], xy[1:, 0], xy[1:, 1]]  # Arrange points
+        deg = np.arctan2(x1 - x2, y1 - y2) / math.pi * 180  # Calculate angels from points
+        deg = np.where(deg < 0, 360 + deg, deg)
+
+        count = np.bincount(np.rint(deg / 45).astype(np.int64), minlength=9)  # Headings: up, left, left, left, down, right, right, right, up
+        scores = [count[4], count[0] + count[8], count[1:4].sum(), count[5:8].sum()]
+        direction = ['down', 'up', 'left', 'right'][int(np.argmax(scores))]  # First direction with the best score
+
+        hX = xy[0, 0] > xy[-1, 0]  # Heading X: left=true, right=false
+        hY = xy[0, 1] < xy[-1, 1]  # Heading Y: down=true, up=false
+        dX = int(xy[-1, 0] - xy[0, 0])  # Pixel movement for X and Y
+        dY = int(xy[-1, 1] - xy[0, 1])
+
+        w, h = [lane.params.camera.resolution.width, lane.params.camera.resolution.height]
+        th = lane.params.lpr.directionThreshold  # Left / right threshold percent
         mX = round((100 / w) * abs(dX))  # X movement in percent
         mY = round((100 / h) * abs(dY))  # Y movement in percent
 
+        points = list(zip(xy[:, 0].tolist(), xy[:, 1].tolist(), ts.tolist()))
         log(LogType.DEBUG, 'direction_lookup', f'Movement tracking [{plate}]. hX:{"left" if hX else "right"}, hY:{"down" if hY else "up"}. x:{mX}%, y:{mY}%. dX:{dX}, dY:{dY}. {str(points)}')
 
         if direction in ['right', 'left']:
@@ -1348,28 +1433,24 @@ def direction_lookup(plate: str, points: list) -> str:
             return 'unknown'
 
 
-def calculate_speed(plate, points: list) -> float:
-    global CAM_PARAMS
-
-    h1 = int(CAM_PARAMS.lpr.frameHeight)  # Image height in centimeters
-    h2 = int(CAM_PARAMS.camera.resolution.height)  # Image resolution height in pixels
+def calculate_speed(lane: Lane, plate, xy: any, ts: any) -> float:
+    h1 = int(lane.params.lpr.frameHeight)  # Image height in centimeters
+    h2 = int(lane.params.camera.resolution.height)  # Image resolution height in pixels
     if h1 == 0 or h2 == 0:
         return 0.0
-    elif len(points) < 2:
+    elif len(ts) < 2:
         return 0.0
     else:
         try:
-            speed = n = 0
-            for i in range(len(points) - 1):
-                _, y1, ts1 = points[i]  # First point
-                _, y2, ts2 = points[i + 1]  # Next point
-                cm_px = float(h1 / h2)  # cm per pixel
-                td_cm = float(abs(y1 - y2) * cm_px)  # Travelled distance in cm
-                dt = ts2 - ts1  # Delta time in seconds
-                if dt > 0.0:
-                    n += 1
-                    cm_sec = float(td_cm / dt)  # Centimeters per second
-                    speed += float((cm_sec * 60 * 60) / 100000)
+            dt = ts[1:] - ts[:-1]  # Delta time in seconds
+            moved = dt > 0.0
+            n = int(np.count_nonzero(moved))
+            if n == 0:
+                return 0.0
+            cm_px = float(h1 / h2)  # cm per pixel
+            td_cm = np.abs(xy[:-1, 1] - xy[1:, 1])[moved] * cm_px  # Travelled distance in cm
+            cm_sec = td_cm / dt[moved]  # Centimeters per second
+            speed = float(np.add.accumulate((cm_sec * 60 * 60) / 100000)[-1])  # Summed in point order
 
             log(LogType.DEBUG, 'calculate_speed', f'[{plate}]. speed={speed / n:.1f}')
             return round(speed / n, 1)  # Speed in km/h
@@ -1377,16 +1458,14 @@ def calculate_speed(plate, points: list) -> float:
             return 0.0
 
 
-def allow_direction(direction: str) -> bool:
-    global CAM_PARAMS
-
+def allow_direction(lane: Lane, direction: str) -> bool:
     directions = {'front': 1, 'rear': 2, 'both': 3, 'unknown': 4}
     if direction in directions:
-        if CAM_PARAMS.lpr.directionFilter == 1 and directions[direction] == 1:
+        if lane.params.lpr.directionFilter == 1 and directions[direction] == 1:
             return True  # Front
-        elif CAM_PARAMS.lpr.directionFilter == 2 and directions[direction] == 2:
+        elif lane.params.lpr.directionFilter == 2 and directions[direction] == 2:
             return True  # Rear
-        elif CAM_PARAMS.lpr.directionFilter == 3 and directions[direction] in [1, 2, 3, 4]:
+        elif lane.params.lpr.directionFilter == 3 and directions[direction] in [1, 2, 3, 4]:
             return True  # Both and Unknown
         else:
             return False
@@ -1405,48 +1484,142 @@ def remove_empty_plate(reading: PlateReaderResult) -> None:
                 break
 
 
-def append_reading(reading: PlateReaderResult) -> None:
-    global READINGS, CAM_PARAMS, PLATES, IGNORED, GPIO, NEW_PLATE
+def box_iou(a: Box, b: Box) -> float:
+    w = min(a.xMax, b.xMax) - max(a.xMin, b.xMin)
+    h = min(a.yMax, b.yMax) - max(a.yMin, b.yMin)
+    if w <= 0 or h <= 0:
+        return 0.0
+    union = (a.xMax - a.xMin) * (a.yMax - a.yMin) + (b.xMax - b.xMin) * (b.yMax - b.yMin) - w * h
+    return w * h / union if union > 0 else 0.0
+
+
+def box_distance(a: Box, b: Box) -> float:
+    dx = (a.xMin + a.xMax - b.xMin - b.xMax) / 2
+    dy = (a.yMin + a.yMax - b.yMin - b.yMax) / 2
+    return math.hypot(dx, dy) / max(b.xMax - b.xMin, 1)  # Centroid distance in plate widths
 
-    while len(READINGS) > 120:
-        del READINGS[0]
+
+def assign_tracks(lane: Lane, reading: PlateReaderResult, now: float) -> None:
+    lpr = lane.params.lpr
+    tracks = [t for t in lane.boxTracks.copy().values() if now - t.seen <= lpr.trackerMaxAge]
+
+    pairs = []
+    for i, re in enumerate(reading.results):
+        for track in tracks:
+            iou = box_iou(re.box, track.box)
+            if iou > 0 and iou >= lpr.trackerIou:
+                pairs.append((1.0 + iou, i, track))  # Overlapping boxes are matched first
+            else:
+                distance = box_distance(re.box, track.box)
+                if distance <= lpr.trackerDistance:
+                    pairs.append((1.0 / (1.0 + distance), i, track))  # Nearest centroid when the plate moved too far to overlap
+
+    matched, used = [{}, set()]
+    for _, i, track in sorted(pairs, key=lambda x: x[0], reverse=True):  # Greedy assignment, best match first
+        if i not in matched and track.id not in used:
+            matched[i] = track
+            used.add(track.id)
+
+    for i, re in enumerate(reading.results):
+        track = matched.get(i)
+        if track is None:  # New plate in view
+            lane.trackSeq += 1
+            track = lane.boxTracks[lane.trackSeq] = BoxTrack(lane.trackSeq, re.box, now)
+            schedule_timer(lane, now + lpr.trackerMaxAge, 'track', track.id, track)
+        track.box, track.seen = [re.box, now]
+        track.vote(re.text, re.score)
+        re.plate, re.trackId = [track.plate, track.id]  # Key all results of the track on the track
+
+
+def track_plate(lane: Lane, result: Result) -> (str, list):
+    track = lane.boxTracks.get(result.trackId)
+    if track is None:
+        return result.text, []
+    texts = track.ranked()
+    return (texts[0] if len(texts) > 0 else result.text), texts  # Plate text with the most votes and all texts read for the track
+
+
+def append_reading(lane: Lane, reading: PlateReaderResult) -> None:
+    global GPIO, NEW_PLATE
+
+    now = time.monotonic()
+
+    while len(lane.readings) > 120:
+        for re in lane.readings[0].results.copy():
+            unindex_result(lane, lane.readings[0], re)
+            release_plate(lane, re.plate, now)
+        del lane.readings[0]
 
     if len(reading.results) > 0:
-        READINGS.append(reading)
+        lane.readings.append(reading)
+        for re in reading.results:
+            re.plate = re.text = re.plate.upper()
+        if lane.params.lpr.boxTracker:
+            assign_tracks(lane, reading, now)  # Merge OCR variants of the same plate box
+
         for re in reading.results:
             ts = datetime.strptime(reading.timestamp, '%Y-%m-%d %H:%M:%S.%f').timestamp()
-            re.timestamp = datetime.fromtimestamp(ts + (CAM_PARAMS.lpr.decisionDelay / 1000)).strftime('%Y-%m-%d %H:%M:%S.%f')
-            re.plate = re.plate.upper()
-            rtn, txt = check_bounds(re)
+            re.timestamp = datetime.fromtimestamp(ts + (lane.params.lpr.decisionDelay / 1000)).strftime('%Y-%m-%d %H:%M:%S.%f')
+            re.received, re.expire = [now, now + float(lane.params.lpr.resultExpireTime)]  # Result is removed from the buffer when expired
+            index_result(lane, reading, re)
+            if re.plate in lane.ignored:
+                lane.ignored[re.plate] = now  # Blocked plate is still in view
+            rtn, txt = check_bounds(lane, re)
             if rtn.value == 0:
                 re.passed = True
                 GPIO.pulseDigital(DIO.PLATE, 0.1)  # Blink Decision LED
-                if re.plate in PLATES.copy():
-                    PLATES[re.plate] += 1  # Increment license plate counts
+                if re.plate in lane.plates.copy():
+                    lane.plates[re.plate] += 1  # Increment license plate counts
                 else:
-                    PLATES[re.plate] = 1  # Insert new license plate counter
+                    lane.plates[re.plate] = 1  # Insert new license plate counter
                     NEW_PLATE = True
                     auxiliary_control('NEW_PLATE')
 
-                if re.plate not in IGNORED.copy():
-                    log(LogType.DEBUG, 'append_reading1', f'PLATE [{re.plate}]. BOUNDS_CHECK: {rtn.name}, SCORE={re.score}, DSCORE={re.dScore}, RECT={Rectangle(re.box)}')
+                if re.plate not in lane.ignored.copy():
+                    log(LogType.DEBUG, 'append_reading1', f'PLATE [{re.text}]. BOUNDS_CHECK: {rtn.name}, SCORE={re.score}, DSCORE={re.dScore}, RECT={Rectangle(re.box)}')
             else:
                 GPIO.pulseDigital(DIO.WARN, 0.1)  # Blink Bounds Error LED
-                log(LogType.WARNING, 'append_reading2', f'PLATE [{re.plate}]. BOUNDS_CHECK: {rtn.name}. ({txt})')
+                log(LogType.WARNING, 'append_reading2', f'PLATE [{re.text}]. BOUNDS_CHECK: {rtn.name}. ({txt})')
 
+        lane.decisionPlates.update([re.plate for re in reading.results if re.passed])  # Evaluated by the decision thread after this reading
 
-def plate_in_readings(plate: str) -> bool:
-    global READINGS
 
-    for rd in READINGS.copy():
-        for re in rd.results:
-            if re.plate == plate:
-                return True  # Plate still exists in READINGS
+def index_result(lane: Lane, reading: PlateReaderResult, re: Result) -> None:
+    with lane.indexLock:
+        lane.plateIndex.setdefault(re.plate, []).append((reading, re))  # Results of a plate in reading order
+    schedule_timer(lane, re.expire, 'result', re.plate, (reading, re))
 
-    return False
+
+def unindex_result(lane: Lane, reading: PlateReaderResult, re: Result) -> None:
+    with lane.indexLock:
+        results = lane.plateIndex.get(re.plate, [])
+        for i, (rd, r) in enumerate(results):
+            if r is re:
+                del results[i]
+                break
+        if len(results) == 0:
+            lane.plateIndex.pop(re.plate, None)
+        if re in reading.results:
+            reading.results.remove(re)
+
+
+def plate_results(lane: Lane, plate: str) -> list:
+    return list(lane.plateIndex.get(plate, []))  # [(reading, result)]
 
 
-def find_candidate(data: Decision, enabled: bool) -> (bool, str):
+def text_results(lane: Lane, text: str) -> list:
+    if not lane.params.lpr.boxTracker:
+        return plate_results(lane, text)
+    with lane.indexLock:
+        results = [(rd, re) for key in lane.plateIndex.values() for rd, re in key if re.text == text]  # Plates are keyed by track id
+    return sorted(results, key=lambda r: r[1].received)  # [(reading, result)] oldest first
+
+
+def plate_in_readings(lane: Lane, plate: str) -> bool:
+    return plate in lane.plateIndex  # Plate still exists in readings
+
+
+def find_candidate(data: Decision, enabled: bool, candidates=None) -> (bool, str):
     plate = str(data.plate)
     if not enabled:
         return False, ''
@@ -1460,7 +1633,7 @@ def find_candidate(data: Decision, enabled: bool) -> (bool, str):
         return False, ''
     else:
         if plate[0:1].isnumeric() or plate[1:2].isnumeric() or not plate[2:].isnumeric():
-            for candidate in data.candidates:
+            for candidate in data.candidates if candidates is None else candidates:
                 cnd = str(candidate['plate'])
                 if not cnd[0:1].isnumeric() and not cnd[1:2].isnumeric() and cnd[2:].isnumeric():
                     return True, cnd
@@ -1469,23 +1642,7 @@ def find_candidate(data: Decision, enabled: bool) -> (bool, str):
             return False, ''
 
 
-def remove_direction_points() -> None:
-    global DIRECTIONS
-
-    for plate, points in DIRECTIONS.copy().items():
-        if len(points['ts']) == 0:  # Delete item if plate has no points
-            del DIRECTIONS[plate]
-            break
-        else:
-            for i, ts in enumerate(points['ts']):
-                if ts < (time.time() - 60.0):  # Delete point if it is older than current time - 60 seconds:
-                    del points['x'][i]
-                    del points['y'][i]
-                    del points['ts'][i]
-                    break
-
-
-def open_camera(address: str, username: str, password: str) -> (bool, any, str):
+def open_camera(address: str, username: str, password: str, backend=CaptureBackend.DEFAULT.value, options='', timeout=5000) -> (bool, any, str):
     try:
         mode = cv2.CAP_DSHOW  # Windows DirectShow
         if platform.system() == 'Linux':
@@ -1503,56 +1660,124 @@ def open_camera(address: str, username: str, password: str) -> (bool, any, str):
             i = address.find('@')
             if i >= 0:
                 adr = f'{address[:i]}{username}:{password}{address[i:]}'
-                return True, cv2.VideoCapture(str(adr)), str(id)
             else:
-                return True, cv2.VideoCapture(str(address)), str(id)
-    except (ValueError, Exception):
+                adr = address
+
+            params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout]  # Stalled streams must not block the reader
+            if backend == CaptureBackend.FFMPEG.value:
+                with CAPTURE_LOCK:  # OpenCV reads the options from the environment when the capture is opened
+                    saved = os.environ.get('OPENCV_FFMPEG_CAPTURE_OPTIONS')
+                    os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = str(options)  # Low latency FFmpeg options, e.g. fflags;nobuffer|flags;low_delay
+                    try:
+                        cam = cv2.VideoCapture(str(adr), cv2.CAP_FFMPEG, params)
+                    finally:
+                        if saved is None:
+                            os.environ.pop('OPENCV_FFMPEG_CAPTURE_OPTIONS', None)  # Other lanes must not inherit the options
+                        else:
+                            os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = saved
+                cam.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimal buffering
+                return True, FrameGrabber(cam, timeout / 1000), str(id)
+            elif backend == CaptureBackend.GSTREAMER.value:
+                cam = cv2.VideoCapture(str(options).format(address=adr), cv2.CAP_GSTREAMER)
+                return True, FrameGrabber(cam, timeout / 1000), str(id)
+            else:
+                with CAPTURE_LOCK:  # Not opened while another lane has set its FFmpeg options
+                    cam = cv2.VideoCapture(str(adr), cv2.CAP_ANY, params)
+                return True, cam, str(id)
+    except (ValueError, KeyError, Exception):
         return False, None, ''
 
 
-def set_camera_parameters(cam: any) -> any:
-    global CAM_PARAMS
+def open_replay(lane: Lane) -> (bool, any, str):
+    try:
+        path = lane.params.camera.address[len('file://'):]
+        start = datetime.fromisoformat(lane.params.camera.replayStart).timestamp()
+        cam = ReplaySource(path, lane.params.camera.replaySpeed, lane.params.camera.replayFrameRate, start)
+        file = get_work_dir(f'replay/lane{lane.index}.csv')
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file, 'w') as f:
+            f.write('timestamp,plate,direction,speed,score,dscore,elapsed\n')  # Decisions of this replay
+        lane.replay = cam
+        return True, cam, Path(path).stem
+    except (ValueError, Exception) as e:
+        log(LogType.ERROR, 'open_replay', e)
+        return False, None, ''
+
+
+def finish_replay(lane: Lane, cam: ReplaySource) -> None:
+    global STARTED
+
+    timeout = time.time() + 30.0
+    while STARTED and time.time() < timeout and ((lane.takenId < lane.frameId and recognition_running(lane)) or lane.delivered < lane.sequence):
+        sleep(0.01)  # Wait for the last readings
+    elapsed = max(time.time() - cam.started, 0.001)
+    sleep(1.0)  # Let pending decisions finish
+    log(LogType.DEBUG, 'finish_replay', f'REPLAY: [{cam.path}] FINISHED. Frames={cam.index}, recognized={lane.sequence}, decisions={cam.decisions}, '
+                                        f'time={elapsed:.1f} s, {cam.index / elapsed:.1f} fps, {lane.sequence / elapsed:.1f} recognitions/s')
+
+
+def recognition_running(lane: Lane) -> bool:
+    global DEV_PARAMS, CAM_PARAMS
+
+    if lane.params.lpr.options.enabled == 0:
+        return False
+    elif CAM_PARAMS.auxiliary.input1 == AuxiliaryInput.LPR_DISABLED.value and DEV_PARAMS.auxiliary.input1 == 1:
+        return False
+    elif len(lane.frameBuffer) <= 2:
+        return False
+    else:
+        return DEV_PARAMS.status.dockerRunning and DEV_PARAMS.device.sdkStatus == 'OK'  # Same tests as process_lane
+
 
-    cam.set(cv2.CAP_PROP_FRAME_WIDTH, CAM_PARAMS.camera.resolution.width)
-    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, CAM_PARAMS.camera.resolution.height)
-    if CAM_PARAMS.camera.exposure == 0:
+def capture_time(cam: any) -> float:
+    return cam.timestamp if isinstance(cam, ReplaySource) else time.time()  # Replays run on recorded time
+
+
+def set_camera_parameters(lane: Lane, cam: any) -> any:
+    cam.set(cv2.CAP_PROP_FRAME_WIDTH, lane.params.camera.resolution.width)
+    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, lane.params.camera.resolution.height)
+    if lane.params.camera.exposure == 0:
         cam.set(cv2.CAP_PROP_AUTO_EXPOSURE, 3.0)  # Auto exposure on
     else:
         cam.set(cv2.CAP_PROP_AUTO_EXPOSURE, 1.0)  # Auto exposure off
-        cam.set(cv2.CAP_PROP_EXPOSURE, CAM_PARAMS.camera.exposure)
-
-    cam.set(cv2.CAP_PROP_BRIGHTNESS, CAM_PARAMS.camera.brightness)
-    cam.set(cv2.CAP_PROP_CONTRAST, CAM_PARAMS.camera.contrast)
-    cam.set(cv2.CAP_PROP_HUE, CAM_PARAMS.camera.hue)
-    cam.set(cv2.CAP_PROP_SATURATION, CAM_PARAMS.camera.saturation)
-    cam.set(cv2.CAP_PROP_SHARPNESS, CAM_PARAMS.camera.sharpness)
-    cam.set(cv2.CAP_PROP_GAMMA, CAM_PARAMS.camera.gamma)
-    cam.set(cv2.CAP_PROP_GAIN, CAM_PARAMS.camera.gain)
+        cam.set(cv2.CAP_PROP_EXPOSURE, lane.params.camera.exposure)
+
+    cam.set(cv2.CAP_PROP_BRIGHTNESS, lane.params.camera.brightness)
+    cam.set(cv2.CAP_PROP_CONTRAST, lane.params.camera.contrast)
+    cam.set(cv2.CAP_PROP_HUE, lane.params.camera.hue)
+    cam.set(cv2.CAP_PROP_SATURATION, lane.params.camera.saturation)
+    cam.set(cv2.CAP_PROP_SHARPNESS, lane.params.camera.sharpness)
+    cam.set(cv2.CAP_PROP_GAMMA, lane.params.camera.gamma)
+    cam.set(cv2.CAP_PROP_GAIN, lane.params.camera.gain)
     cam.set(cv2.CAP_PROP_BACKLIGHT, 0)
     cam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
     return cam
 
 
-def adjust_camera_brightness(frame, flags: list, delay: int) -> (bool, int, float):  # https://gist.github.com/kmohrf/8d4653536aaa88965a69a06b81bcb022
-    image = Image.fromarray(frame)  # https://stackoverflow.com/questions/43232813/convert-opencv-image-format-to-pil-image-format
-    greyscale_image = image.convert('L')
-    histogram = greyscale_image.histogram()
-    pixels = sum(histogram)
-    brightness = scale = len(histogram)
+def measure_brightness(frame, area: str, step=8) -> float:
+    sample = frame
+    values = str(area).strip().replace(';', ',').split(',')  # x; y; width; height
+    if len(values) == 4:
+        try:
+            x, y, w, h = [int(v) for v in values]
+            if w > 0 and h > 0:
+                sample = frame[max(y, 0):y + h, max(x, 0):x + w]  # Measure brightness area only
+        except ValueError:
+            pass
 
-    for i in range(0, scale):
-        ratio = histogram[i] / pixels
-        brightness += ratio * (-scale + i)
+    if sample.size == 0:
+        sample = frame  # Brightness area is outside the frame
+    height, width = sample.shape[0:2]
+    sample = cv2.resize(sample, (max(width // step, 1), max(height // step, 1)), interpolation=cv2.INTER_NEAREST)  # Subsample every n'th pixel
+    if sample.ndim == 3:
+        sample = cv2.cvtColor(sample, cv2.COLOR_RGB2GRAY)  # Same channel weights as the former PIL conversion of the BGR frame
+    return float(cv2.mean(sample)[0])
 
-    le = 1.0 if brightness == 255 else round((brightness / scale), 3)  # 0 = dark, 1 = bright
-    levels = [(-64, 0.97, 1.0), (-60, 0.939, 0.97), (-56, 0.909, 0.939), (-52, 0.879, 0.909), (-48, 0.848, 0.879), (-44, 0.818, 0.848), (-40, 0.788, 0.818), (-36, 0.758, 0.788),
-              (-32, 0.727, 0.758), (-28, 0.697, 0.727), (-24, 0.667, 0.697), (-20, 0.636, 0.667), (-16, 0.606, 0.636), (-12, 0.576, 0.606), (-8, 0.545, 0.576), (-4, 0.515, 0.545),
-              (0, 0.485, 0.515), (4, 0.455, 0.485), (8, 0.424, 0.455), (12, 0.394, 0.424), (16, 0.364, 0.394), (20, 0.333, 0.364), (24, 0.303, 0.333), (28, 0.273, 0.303),
-              (32, 0.242, 0.273), (36, 0.212, 0.242), (40, 0.182, 0.212), (44, 0.152, 0.182), (48, 0.121, 0.152), (52, 0.091, 0.121), (56, 0.061, 0.091), (60, 0.03, 0.061), (64, 0.0, 0.03)]
 
-    for br, ll, lh in levels:
-        if min(ll, lh) <= le <= max(ll, lh):
-            break
+def adjust_camera_brightness(frame, flags: list, delay: int, area='') -> (bool, int, float):  # https://gist.github.com/kmohrf/8d4653536aaa88965a69a06b81bcb022
+    brightness = measure_brightness(frame, area)  # Average grey level 0..255
+    le = 1.0 if brightness == 255 else round((brightness / 256), 3)  # 0 = dark, 1 = bright
+    br = int(BRIGHTNESS_LEVELS[np.searchsorted(BRIGHTNESS_LIMITS, le, side='right') - 1])  # Find level bucket
 
     if not flags[0] == br and abs(flags[1] - le) > 0.015:
         flags[0] = br  # Measured brightness
@@ -1610,61 +1835,266 @@ def crop_image(frame: any, rectangle: Rectangle, width: int, height: int) -> (bo
         return False, Rectangle(dict(x=rectangle.x, y=rectangle.y, width=rectangle.width, height=rectangle.height)), frame
 
 
-def mask_image(frame: any) -> any:
-    global CAM_PARAMS
+def compile_mask(lane: Lane, frame: any) -> (any, any, tuple):
+    coordinates = str(lane.params.camera.imageMask).strip().replace(';', ',')  # 0, 0; 690, 0; 1280, 700; 1280, 960; 0, 960
+    key = (coordinates, frame.shape[:2], lane.params.camera.mountingAngle)  # Grey and colour frames share the mask
+    cache = lane.maskCache
+    if not cache['key'] == key:
+        mask = rect = None
+        if len(coordinates.split(',')) >= 6:
+            try:
+                height, width = [frame.shape[0], frame.shape[1]]
+                mask = np.full((height, width), 255, dtype=np.uint8)  # Select everything outside the polygon
+                points = np.array([np.array(coordinates.split(','), dtype=int).reshape(-1, 2)])
+                cv2.fillPoly(mask, points, 0)
+
+                x, y, w, h = cv2.boundingRect(points[0].astype(np.int32))  # Bounding box of the mask polygon
+                x1, y1 = [min(x + w, width), min(y + h, height)]
+                x, y = [max(x, 0), max(y, 0)]
+                if x1 > x and y1 > y:
+                    rect = (x, y, x1 - x, y1 - y)
+            except ValueError:
+                mask = rect = None
+
+        lane.maskCache = cache = dict(key=key, mask=mask, fill={}, rect=rect)
+        log(LogType.DEBUG, 'compile_mask', f'Image mask compiled for [{coordinates}], shape={frame.shape[:2]}, rect={rect}')
+
+    mask, fill = [cache['mask'], None]
+    if mask is not None:
+        fill = cache['fill'].get(frame.shape)  # One fill image for each channel count
+        if fill is None:
+            fill = cache['fill'][frame.shape] = np.full(frame.shape, 160, dtype=frame.dtype)  # Any grey tone color value to fill with
+    return mask, fill, cache['rect']
+
+
+def mask_image(lane: Lane, frame: any) -> any:
+    mask, fill, _ = compile_mask(lane, frame)
+    if mask is None:
+        return frame
+    else:
+        return cv2.copyTo(fill, mask, frame)  # Fill masked area in place
 
-    coordinates = str(CAM_PARAMS.camera.imageMask).strip().replace(';', ',')  # 0, 0; 690, 0; 1280, 700; 1280, 960; 0, 960
-    if len(coordinates.split(',')) >= 6:
-        try:
-            height, width = [frame.shape[0], frame.shape[1]]
-            mask = np.zeros((height, width), dtype=np.uint8)
-            points = np.array([np.array(coordinates.split(','), dtype=int).reshape(-1, 2)])
-            mask_value = 1  # 1 channel white (can be any non-zero uint8 value)
-            fill_color = 160  # Any grey tone color value to fill with
-            cv2.fillPoly(mask, points, mask_value)
-            select = mask != mask_value  # Select everything that is not mask_value
-            frame[select] = fill_color
-            return frame
-        except ValueError:
-            return frame
+
+def crop_mask_image(lane: Lane, frame: any) -> (any, int, int):
+    mask, fill, rect = compile_mask(lane, frame)
+    if mask is None or rect is None:
+        return mask_image(lane, frame), 0, 0
     else:
-        return frame
+        x, y, w, h = rect  # Only the bounding box of the mask is sent to the SDK
+        return cv2.copyTo(fill[y:y + h, x:x + w], mask[y:y + h, x:x + w], frame[y:y + h, x:x + w]), x, y
+
+
+def detect_motion(lane: Lane, frame: any, flags: list, threshold: float) -> bool:
+    height, width = frame.shape[0:2]
+    size = (160, max(int(height * 160 / width), 1))  # Downscaled frame size
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    small = cv2.GaussianBlur(small, (5, 5), 0)
+
+    mask, _, _ = compile_mask(lane, frame)
+    if flags[1] is not mask:  # Image mask changed - downscale motion area
+        flags[1] = mask
+        flags[2] = None if mask is None else cv2.resize(cv2.bitwise_not(mask), size, interpolation=cv2.INTER_NEAREST)
+
+    previous = flags[0]
+    flags[0] = small
+    if previous is None or previous.shape != small.shape:
+        return True  # Nothing to compare with
+
+    _, diff = cv2.threshold(cv2.absdiff(small, previous), 25, 255, cv2.THRESH_BINARY)
+    area = flags[2]
+    if area is None:
+        changed, total = [cv2.countNonZero(diff), diff.size]
+    else:
+        changed, total = [cv2.countNonZero(cv2.bitwise_and(diff, area)), cv2.countNonZero(area)]
+    return total > 0 and (100 * changed / total) >= threshold
+
+
+def frame_hash(frame: any) -> int:
+    small = cv2.resize(frame, (72, 64), interpolation=cv2.INTER_LINEAR)  # Subsample first, area resize of a full frame is slow
+    small = cv2.resize(small, (9, 8), interpolation=cv2.INTER_AREA)
+    if len(small.shape) > 2:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()  # dHash. Each bit is a brightness gradient between neighbour pixels
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def duplicate_reading(lane: Lane, frame: dict) -> any:
+    empty = lane.emptyReading
+    if not lane.params.lpr.duplicateFilter or empty is None or frame.get('hash') is None:
+        return None
+    elif time.time() - empty[2] > lane.params.lpr.duplicateMaxAge:
+        return None  # Empty reading is too old - ask the SDK again
+    elif bin(frame['hash'] ^ empty[0]).count('1') > lane.params.lpr.duplicateThreshold:
+        return None  # Frame has changed
+    else:
+        reading = empty[1]
+        return PlateReaderResult(reading.filename, datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), reading.cameraId, None, [], reading.usage, 0.0)
+
+
+def motion_gate(lane: Lane, frame: any, flags: list) -> bool:
+    if not lane.params.lpr.motionGate:
+        return True
+    if detect_motion(lane, frame, flags, lane.params.lpr.motionThreshold):
+        flags[3] = time.time()  # Time of last motion
+        return True
+    elif time.time() - flags[3] < lane.params.lpr.motionHoldTime:
+        return True  # Hold-over after last motion
+    else:
+        ignored = lane.ignored.copy()
+        return any(plate not in ignored for plate in lane.plates.copy())  # Keep reading plates that are not decided yet
+
+
+def update_blocked(lane: Lane, reading: PlateReaderResult) -> None:
+    if lane.params.lpr.blockedFrameRate <= 0 or len(reading.results) == 0:
+        lane.blocked, lane.blockedBoxes = [False, {}]
+        return
+
+    ignored = lane.ignored.copy()
+    boxes = {re.plate: re.box for re in reading.results}
+    still = all(plate in ignored for plate in boxes)
+    for plate, box in boxes.items():
+        last = lane.blockedBoxes.get(plate)
+        if not still or last is None:
+            still = False
+        elif abs((box.xMin + box.xMax) - (last.xMin + last.xMax)) / 2 > lane.params.lpr.blockedTolerance:
+            still = False  # Plate has moved
+        elif abs((box.yMin + box.yMax) - (last.yMin + last.yMax)) / 2 > lane.params.lpr.blockedTolerance:
+            still = False
+
+    if still and not lane.blocked:
+        lane.blockedProbe = 0.0  # First motion check seeds the reference frame
+        log(LogType.DEBUG, 'update_blocked', f'LANE {lane.index}: BLOCKED PLATES {[re.text for re in reading.results]} IN VIEW')
+    lane.blocked = still
+    lane.blockedBoxes = {plate: box for plate, box in boxes.items() if plate in ignored}
+
+
+def blocked_motion(lane: Lane, frame: any, flags: list) -> bool:
+    if time.time() < lane.blockedProbe:
+        return False
+    seed = lane.blockedProbe == 0.0
+    lane.blockedProbe = time.time() + 0.2  # Check for motion 5 times per second
+    if seed:
+        flags[0] = None
+    return detect_motion(lane, frame, flags, lane.params.lpr.motionThreshold) and not seed
+
+
+def get_frame_rate(lane: Lane) -> float:
+    global DEV_PARAMS, INFERENCE_BUFFER, BREAKER
+
+    rate = lane.params.lpr.frameRate
+    if lane.params.lpr.adaptiveFrameRate:
+        if len(lane.plates) > 0 or len(lane.directions) > 0:  # Plates are tracked - read as fast as the SDK can keep up
+            buf = INFERENCE_BUFFER.copy()
+            if len(buf) > 0:
+                inflight = min(max(lane.params.lpr.inflightRequests, 1), MAX_INFLIGHT_REQUESTS)
+                capacity = inflight * 1000 / max(float(np.average(buf)), 1.0)  # SDK capacity in frames per second
+                rate = max(rate, min(capacity * 0.9, lane.params.lpr.maxFrameRate))
+        else:
+            rate = min(rate, lane.params.lpr.idleFrameRate)  # Lane is empty
+
+    if lane.blocked:
+        rate = min(rate, lane.params.lpr.blockedFrameRate)  # Only blocked plates are waiting in view
+    if not BREAKER.state == BreakerState.CLOSED.value:
+        rate = min(rate, lane.params.lpr.degradedFrameRate)  # SDK is failing or too slow
+    rate = max(rate, 0.1)
+    lane.lprFrameRate = round(rate, 1)
+    DEV_PARAMS.statistics.lprFrameRate = sum_lanes('lprFrameRate')
+    return rate
+
+
+def offset_box(box: Box, x: int, y: int) -> Box:
+    return Box(xMin=box.xMin + x, yMin=box.yMin + y, xMax=box.xMax + x, yMax=box.yMax + y)
 
 
-def append_video_buffer(frame: any) -> None:
-    global VIDEO_BUFFER, POST_BUFFER, CAM_PARAMS
+def offset_reading(reading: PlateReaderResult, x: int, y: int) -> None:
+    for re in reading.results:  # Map boxes from the cropped image back to full frame coordinates
+        re.box = offset_box(re.box, x, y)
+        if re.vehicle is not None and re.vehicle.box is not None and re.vehicle.box.xMax > 0:
+            re.vehicle.box = offset_box(re.vehicle.box, x, y)
 
-    include, idx = include_full_image()
-    if not CAM_PARAMS.lpr.decisionRecording.length == 0:
-        size = 25 * CAM_PARAMS.lpr.decisionRecording.length
+
+def video_buffer_size(lane: Lane) -> int:
+    include, idx = include_full_image(lane)
+    if not lane.params.lpr.decisionRecording.length == 0:
+        return 25 * lane.params.lpr.decisionRecording.length
     elif include:
-        size = 25 + abs(idx)
+        return 25 + abs(idx)
+    else:
+        return 0
+
 
+def append_video_buffer(lane: Lane, frame: any) -> None:
+    include, idx = include_full_image(lane)
+    size = video_buffer_size(lane)
+    if lane.params.lpr.decisionRecording.length == 0 and include:
         if idx > 0:
-            POST_BUFFER.append(frame)
-            while len(POST_BUFFER) > 100:
-                del POST_BUFFER[0]
+            lane.postBuffer.append(frame)
+            while len(lane.postBuffer) > 100:
+                del lane.postBuffer[0]
         else:
-            POST_BUFFER.clear()
-    else:
-        size = 0
+            lane.postBuffer.clear()
 
     if size == 0:
-        VIDEO_BUFFER.clear()
+        lane.videoBuffer.clear()
     else:
-        VIDEO_BUFFER.append(frame)
-        while len(VIDEO_BUFFER) > size:
-            del VIDEO_BUFFER[0]
+        lane.videoBuffer.append(frame)
+        while len(lane.videoBuffer) > size:
+            del lane.videoBuffer[0]
+
+
+def append_raw_buffer(lane: Lane, frame: any) -> None:
+    lane.rawBuffer.append(dict(frame=frame, encoded=None))
+    while len(lane.rawBuffer) > 2:
+        del lane.rawBuffer[0]
+
+
+def get_encoded_frame(lane: Lane) -> any:
+    global CAM_PARAMS
+
+    with lane.encodeLock:
+        if len(lane.rawBuffer) == 0:
+            return None
+
+        raw = lane.rawBuffer[-1]  # Newest raw frame
+        if raw['encoded'] is None:  # Encode the frame on first request only
+            frame = raw['frame']
+            if CAM_PARAMS.videoStream.color == ColorType.BLACK_WHITE.value:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert image to gray scale
+
+            rtn, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
+            if not rtn:
+                return None
+            raw['encoded'] = encoded
+            lane.frameBuffer.insert(2, encoded)  # Insert encoded frame into buffer
+        return raw['encoded']
+
+
+def get_stream_frame(lane: Lane) -> any:
+    lane.streamTime = time.time()  # Keep decoding frames while a stream client is watching
+    return get_encoded_frame(lane)
+
+
+def frame_demanded(lane: Lane, recognize: bool, sample: bool) -> bool:
+    if recognize or sample:
+        return True  # Recognition tick or brightness sample
+    elif video_buffer_size(lane) > 0:
+        return True  # Video buffer needs every frame
+    elif lane.blocked and time.time() >= lane.blockedProbe:
+        return True  # Motion check while only blocked plates are in view
+    else:
+        return time.time() - lane.streamTime < 2.0  # Stream client has requested a frame within the last 2 seconds
 
 
 def platerecognizer_info() -> None:
-    global DEV_PARAMS, SDK_ADDRESS
+    global DEV_PARAMS, SDK_ADDRESS, SDK
 
     try:
         DEV_PARAMS.device.sdkVersion = ''
         DEV_PARAMS.device.sdkLicense = ''
         url = f'http://{SDK_ADDRESS}/info/'
-        response = requests.get(url=url)
+        response = SDK.get(url=url)
         if response.status_code == 200:
             js = str(response.json()).replace("\'", "\"").replace("None", "null")
             info = Pykson().from_json(js, SdkInformation, accept_unknown=True)
@@ -1678,52 +2108,96 @@ def platerecognizer_info() -> None:
         DEV_PARAMS.device.sdkStatus = 'Not running'  # SDK not running
 
 
-def platerecognizer_recognize(frame: any) -> (bool, int, str):
-    global SDK_ADDRESS, SDK_TOKEN, CAM_PARAMS
-
-    data = {'regions': [CAM_PARAMS.lpr.region], 'camera_id': CAM_PARAMS.camera.id}
+def sdk_request_data(lane: Lane) -> dict:
+    data = {'regions': [lane.params.lpr.region], 'camera_id': lane.params.camera.id}
 
     config = {}
-    if not CAM_PARAMS.lpr.options.mode == '':
-        config.update({'mode': CAM_PARAMS.lpr.options.mode})
-    if not CAM_PARAMS.lpr.options.detection_rule == '':
-        config.update({'detection_rule': CAM_PARAMS.lpr.options.detection_rule})
-    if not CAM_PARAMS.lpr.options.detection_mode == '':
-        config.update({'detection_mode': CAM_PARAMS.lpr.options.detection_mode})
+    if not lane.params.lpr.options.mode == '':
+        config.update({'mode': lane.params.lpr.options.mode})
+    if not lane.params.lpr.options.detection_rule == '':
+        config.update({'detection_rule': lane.params.lpr.options.detection_rule})
+    if not lane.params.lpr.options.detection_mode == '':
+        config.update({'detection_mode': lane.params.lpr.options.detection_mode})
 
     data['config'] = json.dumps(config)
 
-    if CAM_PARAMS.lpr.options.mmc:
+    if lane.params.lpr.options.mmc:
         data['mmc'] = True
+    return data
+
+
+def platerecognizer_recognize(lane: Lane, frame: any) -> (bool, int, any):
+    global SDK_ADDRESS, SDK_TOKEN, SDK
 
-    status = 503
+    status, start = [503, time.time()]
     try:
         url = f'http://{SDK_ADDRESS}/alpr'
         headers = {'Authorization': f'Token {SDK_TOKEN}'}
         image = frame.tobytes()
-        response = requests.post(url=url, files=dict(upload=image), data=data, headers=headers)
+        response = SDK.post(url=url, files=dict(upload=image), data=sdk_request_data(lane), headers=headers)
         status = response.status_code
+        record_sdk_request(status, start)
         if status == 200:
-            js = str(response.json()).replace("\'", "\"").replace("None", "null")
-            return True, status, js
+            return True, status, PlateReaderResult.from_json(response.content)
         else:
-            return False, status, ''
+            return False, status, None
     except (ValueError, ConnectionError, requests.exceptions.RequestException) as e:
         log(LogType.NETWORK, 'platerecognizer_recognize', e)
-        return False, status, ''
+        record_sdk_request(status, start)
+        return False, status, None
+
+
+async def platerecognizer_recognize_async(lane: Lane, frame: any, probe=0) -> (bool, int, any):
+    global SDK_ADDRESS, SDK_TOKEN, SDK
+
+    status, start = [503, time.time()]
+    try:
+        url = f'http://{SDK_ADDRESS}/alpr'
+        headers = {'Authorization': f'Token {SDK_TOKEN}'}
+        status, content = await SDK.post_async(url, data=sdk_request_data(lane), files=dict(upload=frame.tobytes()), headers=headers)
+        record_sdk_request(status, start, probe)
+        if status == 200:
+            return True, status, PlateReaderResult.from_json(content)
+        else:
+            return False, status, None
+    except (ValueError, ConnectionError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log(LogType.NETWORK, 'platerecognizer_recognize_async', e)
+        record_sdk_request(status, start, probe)
+        return False, status, None
+
+
+def sdk_overloaded(status: int) -> bool:
+    return status == 429 or status >= 500  # Busy, failing or unreachable SDK
+
+
+def record_sdk_request(status: int, start: float, probe=0) -> None:
+    global DEV_PARAMS, CAM_PARAMS, BREAKER
+
+    if BREAKER.record(CAM_PARAMS.lpr, sdk_overloaded(status), (time.time() - start) * 1000, probe):
+        log(LogType.NETWORK, 'record_sdk_request', f'SDK CIRCUIT BREAKER {BreakerState(BREAKER.state).name}. HTTP status: {status}')
+    DEV_PARAMS.status.sdkBreaker = BREAKER.state
+    DEV_PARAMS.statistics.breakerTransitions = BREAKER.transitions
+
+
+def sum_lanes(name: str) -> any:
+    global LANES
+
+    return sum(getattr(lane, name) for lane in LANES.copy())  # Device statistics is the sum of all lanes
 
 
 def calculate_statistics() -> None:
-    global FRAME_BUFFER, DEV_PARAMS, INFERENCE_BUFFER
+    global LANES, DEV_PARAMS, INFERENCE_BUFFER, SDK
 
-    if len(FRAME_BUFFER) > 4:
-        while len(FRAME_BUFFER) > 50:
-            del FRAME_BUFFER[-1]  # Remove last frame if buffer contains more than 50 elements
+    buf = []
+    for lane in LANES.copy():
+        if len(lane.frameBuffer) > 4:
+            while len(lane.frameBuffer) > 50:
+                del lane.frameBuffer[-1]  # Remove last frame if buffer contains more than 50 elements
 
-        buf = []
-        for i in range(2, len(FRAME_BUFFER) - 1):
-            buf.append(len(FRAME_BUFFER[i]))  # Fill buffer with length on all images
+            for i in range(2, len(lane.frameBuffer) - 1):
+                buf.append(len(lane.frameBuffer[i]))  # Fill buffer with length on all images
 
+    if len(buf) > 0:
         if DEV_PARAMS.statistics.minFrameSize == 0 or DEV_PARAMS.statistics.minFrameSize > np.min(buf):
             DEV_PARAMS.statistics.minFrameSize = int(np.min(buf))  # Find the minimum frame length
         if DEV_PARAMS.statistics.maxFrameSize == 0 or DEV_PARAMS.statistics.maxFrameSize < np.max(buf):
@@ -1752,12 +2226,28 @@ def calculate_statistics() -> None:
         DEV_PARAMS.statistics.maxLprTime = 0
         DEV_PARAMS.statistics.avgLprTime = 0
 
+    DEV_PARAMS.statistics.sdkRequests = SDK.requests
+    DEV_PARAMS.statistics.sdkConnections = SDK.connections
+    times = SDK.connectTimes.copy()
+    DEV_PARAMS.statistics.avgConnectTime = round(np.average(times), 1) if len(times) > 0 else 0.0
+
 
 def reset_statistics(flags: int) -> None:
-    global DEV_PARAMS
+    global DEV_PARAMS, SDK, BREAKER
 
+    SDK.requests, SDK.connections = [0, 0]
+    SDK.connectTimes.clear()
+    BREAKER.transitions = 0
     DEV_PARAMS.statistics.cameraFramesPerSecond = 0
     DEV_PARAMS.statistics.ocrFramesPerSecond = 0
+    DEV_PARAMS.statistics.droppedFramesPerSecond = 0
+    DEV_PARAMS.statistics.suppressedFrames = 0
+    DEV_PARAMS.statistics.duplicateFrames = 0
+    DEV_PARAMS.statistics.cameraReconnects = 0
+    DEV_PARAMS.statistics.recoveryTime = 0.0
+    DEV_PARAMS.statistics.expiredReadings = 0
+    DEV_PARAMS.statistics.breakerTransitions = 0
+    DEV_PARAMS.statistics.breakerRejections = 0
     DEV_PARAMS.statistics.minFrameSize = 0
     DEV_PARAMS.statistics.maxFrameSize = 0
     DEV_PARAMS.statistics.avgFrameSize = 0
@@ -2041,245 +2531,647 @@ def do_tasks() -> None:
                         update_firmware()
 
 
-def do_poll_camera() -> None:
-    global STARTED, DEV_PARAMS, CAM_PARAMS, FRAME_BUFFER, TRIGGERS
+def reconnect_delay(attempt: int, minimum: float, maximum: float) -> float:
+    delay = min(maximum, minimum * (2 ** min(attempt, 16)))  # Exponential backoff
+    return delay * random.uniform(0.5, 1.0)  # Jitter keeps lanes and devices from reconnecting in lockstep
+
+
+def frozen_frame(frame: any, flags: list, timeout: int) -> bool:
+    if timeout <= 0:
+        return False
+    signature = cv2.resize(frame, (16, 16), interpolation=cv2.INTER_AREA)  # A live camera always has some sensor noise
+    if flags[0] is None or not np.array_equal(signature, flags[0]):
+        flags[0] = signature
+        flags[1] = time.time()  # Time of last changed frame
+        return False
+    else:
+        return time.time() - flags[1] > timeout
+
+
+def do_poll_camera(lane: Lane) -> None:
+    global STARTED, DEV_PARAMS, CAM_PARAMS
 
-    TRIGGERS[0].acquire()  # Trigger to start plate recognition
     BR_FLAGS = [0, 0, 0, 0]  # Adjust brightness flags
+    MD_FLAGS = [None, None, None, 0.0]  # Motion detection flags
+    BL_FLAGS = [None, None, None, 0.0]  # Motion detection flags while blocked
+    attempt = 0  # Failed reconnect attempts
+    lost = None  # Time the camera stream was lost
     while STARTED:
-        rtn, cam, CAM_PARAMS.camera.id = open_camera(CAM_PARAMS.camera.address, CAM_PARAMS.camera.username, CAM_PARAMS.camera.password)
+        if lane.params.camera.captureBackend == CaptureBackend.GSTREAMER.value:
+            options = lane.params.camera.gstreamerPipeline
+        else:
+            options = lane.params.camera.ffmpegOptions
+        if lane.params.camera.address.startswith('file://'):
+            rtn, cam, lane.params.camera.id = open_replay(lane)  # Recorded video or image directory
+        else:
+            lane.replay = None
+            rtn, cam, lane.params.camera.id = open_camera(lane.params.camera.address, lane.params.camera.username, lane.params.camera.password,
+                                                          lane.params.camera.captureBackend, options, lane.params.camera.readTimeout)
         # cam.setExceptionMode(True)
-        DEV_PARAMS.status.cameraConnected = rtn and cam.isOpened()
-        FRAME_BUFFER.clear()
-        if not DEV_PARAMS.status.cameraConnected:
-            log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{CAM_PARAMS.camera.address}] COULD NOT CONNECT')
-            cam.release()
-            sleep(12.0)
+        lane.connected = rtn and cam.isOpened()
+        DEV_PARAMS.status.cameraConnected = all(ln.connected for ln in LANES.copy())
+        if not lane.connected:
+            delay = reconnect_delay(attempt, lane.params.camera.reconnectDelay, lane.params.camera.maxReconnectDelay)
+            log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{lane.params.camera.address}] COULD NOT CONNECT. Retry in {delay:.1f} s')
+            if cam is not None:
+                cam.release()
+            attempt += 1
+            sleep(delay)
 
         else:  # Camera is connected
-            cam = set_camera_parameters(cam)
-            delay1, delay2 = [time.time(), time.time()]  # Delays
+            cam = set_camera_parameters(lane, cam)
+            delay1, delay2 = [time.time(), capture_time(cam)]  # Delays
             err = 0  # Camera read errors
             fps = 0  # Frames per second
-            log(LogType.DEBUG, 'do_poll_camera', f'CAMERA: [address={CAM_PARAMS.camera.address} - {cam.getBackendName()}] CONNECTED')
+            dropped = 0  # Stale frames dropped by a low latency capture backend
+            last = time.time()  # Time of last successful read
+            FZ_FLAGS = [None, time.time()]  # Frozen frame flags
+            log(LogType.DEBUG, 'do_poll_camera', f'CAMERA: [address={lane.params.camera.address} - {cam.getBackendName()}] CONNECTED')
 
             while STARTED:
                 try:
-                    if CAM_PARAMS.camera.changed:  # Set camera parameters
+                    if lane.params.camera.changed:  # Set camera parameters
                         log(LogType.DEBUG, 'do_poll_camera', 'Camera parameters changed')
-                        CAM_PARAMS.camera.changed = False
-                        cam = set_camera_parameters(cam)
+                        lane.params.camera.changed = False
+                        cam = set_camera_parameters(lane, cam)
+
+                    if lane.replay is not None and lane.replay.speed <= 0:
+                        timeout = time.time() + 5.0
+                        while STARTED and lane.takenId < lane.frameId and recognition_running(lane) and time.time() < timeout:
+                            sleep(0.001)  # Replay as fast as recognition takes the frames
+
+                    if lane.params.camera.captureMode == CaptureMode.GRAB.value:
+                        new_frame = None
+                        rtn = cam.grab()  # Advance the stream without decoding the frame
+                        if rtn and frame_demanded(lane, capture_time(cam) >= delay2, time.time() >= (delay1 + 1) and int(lane.params.camera.brightness) == 0):
+                            rtn, new_frame = cam.retrieve()  # Decode the grabbed frame
+                    else:
+                        rtn, new_frame = cam.read()  # Read camera frame
+
+                    if not rtn and lane.replay is not None and lane.replay.finished:
+                        finish_replay(lane, cam)
+                        address = lane.params.camera.address
+                        while STARTED and lane.params.camera.address == address:
+                            sleep(1.0)  # Idle until the lane gets a new address
+                        break
 
-                    rtn, new_frame = cam.read()  # Read camera frame
                     if not rtn:  # Read error
                         err += 1
-                        if err > 25:
-                            log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{CAM_PARAMS.camera.address}] DISCONNECTED')
+                        if err > 25 or time.time() - last > lane.params.camera.readTimeout / 1000:
+                            log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{lane.params.camera.address}] DISCONNECTED')
                             break
 
                     else:  # Read success
                         err = 0
-                        frame = rotate_frame(new_frame, CAM_PARAMS.camera.mountingAngle)
-                        append_video_buffer(frame)
+                        last = time.time()
+                        if lost is not None:  # First frame after the camera was lost
+                            DEV_PARAMS.statistics.cameraReconnects += 1
+                            DEV_PARAMS.statistics.recoveryTime = round(last - lost, 1)
+                            log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{lane.params.camera.address}] RECOVERED after {last - lost:.1f} s')
+                            lost = None
+                            attempt = 0
+
+                        sample = None  # Brightness of the rotated frame before recognition converts or masks it
+                        if new_frame is not None:  # Frame is decoded
+                            if lane.replay is None and frozen_frame(new_frame, FZ_FLAGS, lane.params.camera.freezeTime):
+                                log(LogType.NETWORK, 'do_poll_camera', f'CAMERA: [{lane.params.camera.address}] FROZEN')
+                                break
+
+                            frame = rotate_frame(new_frame, lane.params.camera.mountingAngle)
+                            append_video_buffer(lane, frame)
+                            append_raw_buffer(lane, frame)  # Frame is encoded when a stream, recognition or decision needs it
+                            if int(lane.params.camera.brightness) == 0 and time.time() >= (delay1 + 1):
+                                sample = adjust_camera_brightness(frame, BR_FLAGS, 10, lane.params.camera.brightnessArea)  # Measured before the recognition tick changes the frame
+
+                            if lane.blocked and blocked_motion(lane, frame, BL_FLAGS):
+                                lane.blocked = False
+                                delay2 = capture_time(cam)  # Motion - resume full frame rate now
+                                log(LogType.DEBUG, 'do_poll_camera', f'LANE {lane.index}: MOTION WHILE BLOCKED')
+
+                            if capture_time(cam) >= delay2:  # Time is up for plate recognition
+                                delay2 = capture_time(cam) + (1 / get_frame_rate(lane))
+                                encoded = None
+                                if motion_gate(lane, frame, MD_FLAGS):
+                                    encoded = get_encoded_frame(lane)
+                                else:
+                                    DEV_PARAMS.statistics.suppressedFrames += 1  # No motion - skip recognition
 
-                        if CAM_PARAMS.videoStream.color == ColorType.BLACK_WHITE.value:
-                            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert image to gray scale
+                                if encoded is not None:
+                                    if CAM_PARAMS.videoStream.color == ColorType.BLACK_WHITE.value:
+                                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert image to gray scale
 
-                        rtn, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
-                        if rtn:
-                            FRAME_BUFFER.insert(2, encoded)  # Insert encoded frame into buffer
+                                    if lane.params.lpr.cropMask:
+                                        masked, x, y = crop_mask_image(lane, frame)  # Crop frame to the bounding box of the mask
+                                    else:
+                                        masked, x, y = [mask_image(lane, frame), 0, 0]
 
-                            if time.time() >= delay2:  # Time is up for plate recognition
-                                delay2 = time.time() + (1 / CAM_PARAMS.lpr.frameRate)
-                                rtn, encoded_mask = cv2.imencode('.jpg', mask_image(frame), [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
-                                FRAME_BUFFER[0] = dict(id=1, image=encoded, masked_image=encoded_mask)  # Add frame to buffer position 0
-                                if TRIGGERS[0].locked():
-                                    TRIGGERS[0].release()  # Signal to start plate recognition
+                                    rtn, encoded_mask = cv2.imencode('.jpg', masked, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
+                                    dhash = frame_hash(masked) if lane.params.lpr.duplicateFilter else None
+                                    lane.frameId += 1
+                                    lane.frameBuffer[0] = dict(id=lane.frameId, timestamp=time.time(), image=encoded, masked_image=encoded_mask, offset=(x, y), hash=dhash,
+                                                                 raw=masked if lane.params.lpr.mosaicBatch else None, replayTime=None if lane.replay is None else cam.timestamp)  # Add frame to buffer position 0
+                                    signal_frame(lane)
 
                         fps += 1  # Count camera frames per second
                         if time.time() >= (delay1 + 1):
                             delay1 = time.time()
-                            DEV_PARAMS.statistics.cameraFramesPerSecond = fps
+                            lane.cameraFramesPerSecond = fps
+                            DEV_PARAMS.statistics.cameraFramesPerSecond = sum_lanes('cameraFramesPerSecond')
                             fps = 0
+                            if isinstance(cam, FrameGrabber):
+                                lane.droppedFramesPerSecond = cam.dropped - dropped
+                                DEV_PARAMS.statistics.droppedFramesPerSecond = sum_lanes('droppedFramesPerSecond')
+                                dropped = cam.dropped
 
-                            if int(CAM_PARAMS.camera.brightness) == 0:
-                                rtn, bright, level = adjust_camera_brightness(new_frame, BR_FLAGS, 10)
+                            if int(lane.params.camera.brightness) == 0:
+                                rtn, bright, level = [False, 0, 0.0] if sample is None else sample
                                 if rtn:
                                     log(LogType.DEBUG, 'do_poll_camera', f'set brightness to {bright}')
-                                    DEV_PARAMS.status.brightnessLevel = bright
-                                    CAM_PARAMS.camera.irLightControl.currentBrightness = bright
+                                    if lane.index == 0:
+                                        DEV_PARAMS.status.brightnessLevel = bright
+                                    lane.params.camera.irLightControl.currentBrightness = bright
                                     cam.set(cv2.CAP_PROP_BRIGHTNESS, float(bright))
                             else:
-                                DEV_PARAMS.status.brightnessLevel = int(CAM_PARAMS.camera.brightness)
-                                CAM_PARAMS.camera.irLightControl.currentBrightness = int(CAM_PARAMS.camera.brightness)
+                                if lane.index == 0:
+                                    DEV_PARAMS.status.brightnessLevel = int(lane.params.camera.brightness)
+                                lane.params.camera.irLightControl.currentBrightness = int(lane.params.camera.brightness)
 
                 except (ValueError, Exception) as e:
                     log(LogType.WARNING, 'do_poll_camera', e)
                     break
 
             cam.release()
+            lane.connected = False
+            DEV_PARAMS.status.cameraConnected = False
+            lane.rawBuffer.clear()  # Recognition and decision threads keep their buffers while reconnecting
+            if lane.replay is not None and lane.replay.finished:
+                lost, attempt = [None, 0]  # Replay ended and the lane got a new address. Opening it is not a reconnect
+            elif lost is None:
+                lost = time.time()  # Reconnect at once after the first loss
+            elif STARTED:
+                attempt += 1
+                sleep(reconnect_delay(attempt, lane.params.camera.reconnectDelay, lane.params.camera.maxReconnectDelay))  # Connected but no frames
     log(LogType.DEBUG, 'do_poll_camera', 'CAMERA RELEASED')
 
 
-def do_process_image() -> None:
-    global STARTED, DEV_PARAMS, CAM_PARAMS, FRAME_BUFFER, INFERENCE_BUFFER, TRIGGERS
+def take_frame(lane: Lane) -> (int, any):
+    global DEV_PARAMS
+
+    with lane.resultLock:
+        frame = lane.frameBuffer[0]  # Get frame from buffer. dict(id=, timestamp=, image=, masked_image=, offset=)
+        if not isinstance(frame, dict) or frame['id'] <= lane.takenId:
+            return -1, None  # Frame is already taken by another worker
+
+        lane.takenId = frame['id']
+        seq = lane.sequence  # Requests are numbered in capture order
+        lane.sequence += 1
 
-    fps = 0
-    delay = time.time()
+        lane.processed[0] += 1  # Count processed frames per second
+        if time.time() >= (lane.processed[1] + 1):
+            lane.processed[1] = time.time()
+            lane.ocrFramesPerSecond = lane.processed[0]
+            DEV_PARAMS.statistics.ocrFramesPerSecond = sum_lanes('ocrFramesPerSecond')
+            lane.processed[0] = 0
+        return seq, frame
 
+
+def deliver_reading(lane: Lane, seq: int, reading: any) -> None:
+    global DEV_PARAMS
+
+    with lane.resultLock:
+        lane.results[seq] = reading  # None when the request failed
+        while lane.delivered in lane.results:  # Deliver finished readings in capture order
+            reading = lane.results.pop(lane.delivered)
+            lane.delivered += 1
+            if reading is None:
+                pass
+            elif 0 < lane.params.lpr.maxResultAge < (time.time() - reading.frame['timestamp']) * 1000:
+                DEV_PARAMS.statistics.expiredReadings += 1  # Reading is too old to be used for decisions
+            else:
+                if reading.frame.get('replayTime') is not None:
+                    reading.timestamp = datetime.fromtimestamp(reading.frame['replayTime']).strftime('%Y-%m-%d %H:%M:%S.%f')  # Recorded time
+                lane.deliveries.append(reading)  # Decisions are made by the lane's decision thread, not on the event loop
+                signal_decision(lane, [])
+
+
+def apply_reading(lane: Lane, reading: PlateReaderResult) -> None:
+    append_reading(lane, reading)
+    update_blocked(lane, reading)
+    finalize_decision(lane, reading)
+
+
+def signal_frame(lane: Lane) -> None:
+    loop = lane.loop
+    if loop is not None and lane.frameEvent is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(lane.frameEvent.set)  # Signal to start plate recognition
+
+
+def cancel_stale_requests(lane: Lane, newer=0.0) -> None:
+    global DEV_PARAMS
+
+    for task, timestamp in lane.pending.copy().items():
+        if task.done():
+            pass
+        elif timestamp < newer or 0 < lane.params.lpr.maxResultAge < (time.time() - timestamp) * 1000:
+            task.cancel()  # A newer frame is already recognized or the reading would be too old to use
+            DEV_PARAMS.statistics.expiredReadings += 1
+
+
+async def recognize_frame(lane: Lane, seq: int, frame: dict, probe=0) -> None:
+    global DEV_PARAMS, INFERENCE_BUFFER, BREAKER
+
+    reading = None
+    try:
+        mosaic = lane.params.lpr.mosaicBatch and frame.get('raw') is not None
+        if mosaic:
+            rtn, status, reading = await mosaic_recognize(lane, frame, probe)  # Recognize the frame together with other lanes
+        else:
+            rtn, status, reading = await platerecognizer_recognize_async(lane, frame['masked_image'], probe)  # Recognize the frame
+        if rtn:
+            reading.frame = frame
+            x, y = frame['offset']
+            if x > 0 or y > 0:
+                offset_reading(reading, x, y)  # Cropped frame - use full frame coordinates
+            if not mosaic:
+                INFERENCE_BUFFER.insert(0, reading.processingTime)  # inference. A mosaic is measured once in process_mosaic
+            DEV_PARAMS.device.sdkUsage = reading.usage.calls
+
+            if reading.error is None:
+                remove_empty_plate(reading)
+                lane.emptyReading = [frame.get('hash'), reading, time.time()] if len(reading.results) == 0 else None
+                cancel_stale_requests(lane, frame['timestamp'])  # Requests for older frames would only hold this reading back
+
+            else:
+                log(LogType.WARNING, 'recognize_frame1', f'Reading error: {reading.error}')
+                DEV_PARAMS.device.sdkStatus = reading.error
+                reading = None
+
+        elif not sdk_overloaded(status):
+            DEV_PARAMS.device.sdkStatus = f'HTTP status: {status}'  # Overload is handled by the circuit breaker
+
+    except asyncio.CancelledError:
+        BREAKER.cancel(probe)  # A cancelled probe must not keep the breaker half open
+        reading = None  # Stale request or shutdown
+    except Exception as e:
+        log(LogType.WARNING, 'recognize_frame2', e)
+        reading = None
+
+    try:
+        deliver_reading(lane, seq, reading)  # Also delivers failed requests, so later readings are not held back
+    except Exception as e:
+        log(LogType.WARNING, 'recognize_frame3', e)
+
+
+async def process_lane(lane: Lane) -> None:
+    global STARTED, DEV_PARAMS, CAM_PARAMS, BREAKER
+
+    lane.loop = asyncio.get_running_loop()
+    lane.frameEvent = asyncio.Event()
     while STARTED:
         DEV_PARAMS.status.watchdog = 0
 
-        if CAM_PARAMS.lpr.options.enabled == 0:
-            sleep(5.0)
+        if lane.params.lpr.options.enabled == 0:
+            await asyncio.sleep(5.0)
         elif CAM_PARAMS.auxiliary.input1 == AuxiliaryInput.LPR_DISABLED.value and DEV_PARAMS.auxiliary.input1 == 1:
-            sleep(5.0)
-        elif len(FRAME_BUFFER) <= 2:
-            sleep(5.0)
+            await asyncio.sleep(5.0)
+        elif len(lane.frameBuffer) <= 2:
+            await asyncio.sleep(5.0)
         elif not DEV_PARAMS.status.dockerRunning or DEV_PARAMS.device.sdkStatus == '':
-            sleep(15.0)
+            await asyncio.sleep(15.0)
         elif DEV_PARAMS.device.sdkStatus != 'OK':
-            log(LogType.WARNING, 'do_process_image1', DEV_PARAMS.device.sdkStatus)
-            sleep(15.0)
+            log(LogType.WARNING, 'process_lane1', DEV_PARAMS.device.sdkStatus)
+            await asyncio.sleep(15.0)
+        elif len(lane.pending) >= min(max(lane.params.lpr.inflightRequests, 1), MAX_INFLIGHT_REQUESTS):
+            await asyncio.wait(list(lane.pending), timeout=0.05, return_when=asyncio.FIRST_COMPLETED)  # Wait for a free request slot
+            if lane.frameEvent.is_set():
+                cancel_stale_requests(lane)
         else:
             try:
-                TRIGGERS[0].acquire()  # Block thread until a frame is present
-                frame = FRAME_BUFFER[0]  # Get frame from buffer. dict(id=, timestamp=, image=, masked_image=)
-                fps += 1  # Count processed frames per second
-                if time.time() >= (delay + 1):
-                    delay = time.time()
-                    DEV_PARAMS.statistics.ocrFramesPerSecond = fps
-                    fps = 0
-
-                rtn, status, js = platerecognizer_recognize(frame['masked_image'])  # Recognize the frame
-                if rtn:
-                    reading = Pykson().from_json(js, PlateReaderResult, accept_unknown=True)
-                    reading.frame = frame
-                    INFERENCE_BUFFER.insert(0, reading.processingTime)  # inference
-                    DEV_PARAMS.device.sdkUsage = reading.usage.calls
+                await asyncio.wait_for(lane.frameEvent.wait(), 1.0)  # Wait until a frame is present
+            except asyncio.TimeoutError:
+                continue
+
+            lane.frameEvent.clear()
+            seq, frame = take_frame(lane)
+            if seq < 0:
+                continue
+
+            reading = duplicate_reading(lane, frame)
+            if reading is not None:
+                DEV_PARAMS.statistics.duplicateFrames += 1  # Same view as the last empty frame - skip the SDK call
+                reading.frame = frame
+                try:
+                    deliver_reading(lane, seq, reading)
+                except Exception as e:
+                    log(LogType.WARNING, 'process_lane2', e)
+                continue
 
-                    if reading.error is None:
-                        remove_empty_plate(reading)
-                        append_reading(reading)
-                        finalize_decision(reading)
+            allowed, probe = BREAKER.allow(CAM_PARAMS.lpr)
+            DEV_PARAMS.status.sdkBreaker = BREAKER.state
+            if not allowed:
+                DEV_PARAMS.statistics.breakerRejections += 1  # Give the SDK time to recover
+                try:
+                    deliver_reading(lane, seq, None)
+                except Exception as e:
+                    log(LogType.WARNING, 'process_lane3', e)
+            else:
+                task = asyncio.ensure_future(recognize_frame(lane, seq, frame, probe))
+                lane.pending[task] = frame['timestamp']
+                task.add_done_callback(lambda t: lane.pending.pop(t, None))
+
+    for task in lane.pending.copy():
+        task.cancel()
+    await asyncio.gather(*lane.pending.copy(), return_exceptions=True)
+
+
+def build_mosaic(images: list, gap=16) -> (any, list):
+    if any(len(image.shape) > 2 for image in images):
+        images = [cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if len(image.shape) == 2 else image for image in images]
+
+    width = max(MOSAIC_WIDTH, max(image.shape[1] for image in images))
+    origins, x, y, row = [[], 0, 0, 0]
+    for image in images:  # Place images in rows from left to right
+        h, w = image.shape[0:2]
+        if x > 0 and x + w > width:
+            x, y, row = [0, y + row + gap, 0]
+        origins.append((x, y))
+        x, row = [x + w + gap, max(row, h)]
+
+    height = y + row
+    width = max(ox + image.shape[1] for (ox, _), image in zip(origins, images))
+    mosaic = np.full((height, width) + images[0].shape[2:], 128, dtype=np.uint8)  # Gaps are filled like the image mask
+    for (ox, oy), image in zip(origins, images):
+        h, w = image.shape[0:2]
+        mosaic[oy:oy + h, ox:ox + w] = image
+    return mosaic, origins
+
+
+def split_mosaic(reading: PlateReaderResult, origins: list, images: list) -> list:
+    readings = [PlateReaderResult(reading.filename, reading.timestamp, reading.cameraId, reading.error, [], reading.usage, reading.processingTime) for _ in origins]
+    for re in reading.results:
+        cx, cy = [(re.box.xMin + re.box.xMax) / 2, (re.box.yMin + re.box.yMax) / 2]  # Plate center decides the source image
+        for i, ((ox, oy), image) in enumerate(zip(origins, images)):
+            h, w = image.shape[0:2]
+            if ox <= cx < ox + w and oy <= cy < oy + h:
+                offset_reading(PlateReaderResult(results=[re]), -ox, -oy)  # Mosaic coordinates to source image coordinates
+                readings[i].results.append(re)
+                break
+    return readings
 
-                    else:
-                        log(LogType.WARNING, 'do_process_image2', f'Reading error: {reading.error}')
-                        DEV_PARAMS.device.sdkStatus = reading.error
 
-                else:
-                    DEV_PARAMS.device.sdkStatus = f'HTTP status: {status}'
+async def mosaic_recognize(lane: Lane, frame: dict, probe=0) -> (bool, int, any):
+    global MOSAIC_QUEUE
 
-            except Exception as e:
-                log(LogType.WARNING, 'do_process_image3', e)
+    future = asyncio.get_running_loop().create_future()
+    MOSAIC_QUEUE.append(dict(lane=lane, frame=frame, future=future, probe=probe))
+    if len(MOSAIC_QUEUE) == 1:
+        asyncio.ensure_future(process_mosaic())  # First frame of a new mosaic
+    return await future
 
 
-def do_make_decision() -> None:
-    global STARTED, DEV_PARAMS, CAM_PARAMS, READINGS, IGNORED, PLATES, DIRECTIONS, VIDEO_BUFFER, BOARD, GPIO, GYRO
+async def process_mosaic() -> None:
+    global MOSAIC_QUEUE, CAM_PARAMS, INFERENCE_BUFFER
 
-    delay = 0.1  # 250 ms loop delay
-    while STARTED:
+    delay = time.time() + max(MOSAIC_QUEUE[0]['lane'].params.lpr.mosaicWindow, 0) / 1000  # Window and size of the lane that opens the mosaic
+    while len(MOSAIC_QUEUE) < max(MOSAIC_QUEUE[0]['lane'].params.lpr.mosaicSize, 1) and time.time() < delay:
+        await asyncio.sleep(0.002)  # Wait for frames from other lanes
+
+    size = max(MOSAIC_QUEUE[0]['lane'].params.lpr.mosaicSize, 1)
+    batch = [item for item in MOSAIC_QUEUE[:size] if not item['future'].done()]  # Skip cancelled requests
+    del MOSAIC_QUEUE[:size]
+    if len(MOSAIC_QUEUE) > 0:
+        asyncio.ensure_future(process_mosaic())  # Frames that did not fit into this mosaic
+
+    groups = {}
+    for item in batch:  # Frames are only packed together when the SDK options are the same
+        data = sdk_request_data(item['lane'])
+        del data['camera_id']
+        groups.setdefault(json.dumps(data, sort_keys=True), []).append(item)
+
+    for items in groups.values():
         try:
-            for plate, count in PLATES.copy().items():
-                best = []
-                if count >= CAM_PARAMS.lpr.minRecognitions:  # Enough license plates have been recognized
-                    for rd in READINGS.copy():
-                        for re in rd.results:
-                            if re.plate == plate and re.passed:  # Append Result to a 'best' array for later comparison
-                                re.loops += 1  # Increment loops to get more 'best' data
-                                best.append(dict(image=rd.frame['image'], result=re))
-
-                    loops = 0 if len(best) == 0 else best[-1]['result'].loops
-                    if CAM_PARAMS.lpr.decisionModel == DecisionModel.ACCESS_CONTROL.value:
-                        accept = len(best) >= CAM_PARAMS.lpr.minRecognitions * 2 and loops >= 1
-                    else:
-                        accept = len(best) >= CAM_PARAMS.lpr.minRecognitions and loops > 2
-                    if accept:  # Select first, middle og last decision image
-                        if CAM_PARAMS.lpr.selectedDecision == SelectedDecision.FIRST.value:
-                            i = 0
-                        elif CAM_PARAMS.lpr.selectedDecision == SelectedDecision.MIDDLE.value:
-                            i = math.ceil((len(best) / 2))
-                        else:
-                            i = len(best) - 1
-
-                        result: Result = best[i]['result']  # Set best result
-                        if result.plate not in IGNORED.copy():  # The license plate should not be ignored
-                            log(LogType.DEBUG, 'do_make_decision', f'decisions: {len(best)}, selected index: {i}')
-                            IGNORED[result.plate] = 0
-
-                            image = best[i]['image']  # Set decision image
-                            rectangle = Rectangle(result.box)  # Set plate rectangle
-
-                            fullImage = None
-                            include, idx = include_full_image()
-                            if not include:
-                                pass
-                            elif idx <= 0:
-                                i = len(VIDEO_BUFFER) - abs(idx)
-                                if len(VIDEO_BUFFER) >= i:
-                                    frame = cv2.cvtColor(VIDEO_BUFFER[i - 1], cv2.COLOR_BGR2GRAY)
-                                    _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
-                                    fullImage = b64encode(encoded.tobytes()).decode('ascii')
-
-                            if CAM_PARAMS.lpr.cropDecision.width > 0 and CAM_PARAMS.lpr.cropDecision.height > 0:  # Crop decision image
-                                decode = cv2.imdecode(image, cv2.IMREAD_UNCHANGED)
-                                rtn, rectangle, cropped = crop_image(decode, rectangle, CAM_PARAMS.lpr.cropDecision.width, CAM_PARAMS.lpr.cropDecision.height)
-                                if rtn:  # Crop success
-                                    rtn, image = cv2.imencode('.jpg', cropped, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
-                                else:  # Cropping failed
-                                    image = best[i]['image']
-                                    rectangle = Rectangle(result.box)
-                                    log(LogType.WARNING, 'do_make_decision', 'Cropping failed')
-
-                            # Create new DECISION
-                            decision = Decision(DEV_PARAMS.device.address, str(uuid.uuid4()), result.timestamp,
-                                                result.plate, 'both', result.score, result.dScore, rectangle, 0,
-                                                result.region, result.vehicle, result.candidates,
-                                                b64encode(image.tobytes()).decode('ascii'), fullImage)
-
-                            append_decision(dict(pending=True, delete=False, index=0, id=[], data=decision, result=result))  # Event based decisions
-                            break
+            images = [item['frame']['raw'] for item in items]
+            mosaic, origins = build_mosaic(images)
+            _, encoded = cv2.imencode('.jpg', mosaic, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])  # Compression is shared by all lanes
+            rtn, status, reading = await platerecognizer_recognize_async(items[0]['lane'], encoded, max(item['probe'] for item in items))
+            if rtn:
+                INFERENCE_BUFFER.insert(0, reading.processingTime)  # One SDK call for all frames of the mosaic
+            readings = split_mosaic(reading, origins, images) if rtn else [None] * len(items)
+            for item, rd in zip(items, readings):
+                if not item['future'].done():
+                    item['future'].set_result((rtn, status, rd))
+        except Exception as e:
+            log(LogType.WARNING, 'process_mosaic', e)
+            for item in items:
+                if not item['future'].done():
+                    item['future'].set_result((False, 503, None))
 
-            for rd in READINGS.copy():
-                for re in rd.results:
-                    re.expire += delay  # Increment result expiration timer
-                    if re.expire > float(CAM_PARAMS.lpr.resultExpireTime):
-                        rd.results.remove(re)  # Timer have expired for max. time a Result can stay in the buffer - remove it
-                        break
 
-            for plate, expire in IGNORED.copy().items():
-                if expire < CAM_PARAMS.lpr.plateBlockingTime:
-                    if plate_in_readings(plate):
-                        IGNORED[plate] = 0
-                    else:
-                        IGNORED[plate] += delay
-                else:
-                    if plate in IGNORED:
-                        del IGNORED[plate]  # Timer have expired for ignored license plate - remove it
-                    if plate in PLATES:
-                        del PLATES[plate]
-                    break
+async def await_stopped() -> None:
+    global STARTED
+
+    while STARTED:
+        await asyncio.sleep(0.5)
+
+
+def start_recognition(loop: any, lane: Lane) -> None:
+    asyncio.run_coroutine_threadsafe(process_lane(lane), loop)  # Recognition can share any running event loop, e.g. a websocket server loop
+
+
+def do_recognition() -> None:
+    global RECOGNITION_LOOP, LANES, SDK
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    RECOGNITION_LOOP = loop
+    for lane in LANES.copy():
+        loop.create_task(process_lane(lane))
+
+    loop.run_until_complete(await_stopped())
+    loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop), return_exceptions=True))  # Lanes cancel their requests on shutdown
+    loop.run_until_complete(SDK.close_async())
+    RECOGNITION_LOOP = None
+    loop.close()
+    log(LogType.DEBUG, 'do_recognition', 'RECOGNITION STOPPED')
+
 
-            remove_direction_points()  # Remove outdated direction points
-            sleep(delay)  # 0.05
+def decide_plate(lane: Lane, plate: str, now: float) -> float:
+    global DECISION_SETTLE_TIME
+
+    if lane.plates.get(plate, 0) < lane.params.lpr.minRecognitions or plate in lane.ignored.copy():
+        return 0.0  # Not enough recognitions or already decided
+
+    best = [dict(image=rd.frame['image'], result=re) for rd, re in plate_results(lane, plate) if re.passed]  # Results for later comparison
+    if len(best) > 0:
+        text, _ = track_plate(lane, best[-1]['result'])
+        if text in lane.ignoredText.copy().values():  # Same plate as a decided track that was lost - block this track as well
+            lane.ignored[plate], lane.ignoredText[plate] = [now, text]
+            return 0.0
+
+    if lane.params.lpr.decisionModel == DecisionModel.ACCESS_CONTROL.value:
+        if len(best) < lane.params.lpr.minRecognitions * 2:
+            return 0.0
+    elif len(best) < lane.params.lpr.minRecognitions:
+        return 0.0
+    elif now < best[-1]['result'].received + DECISION_SETTLE_TIME:
+        return best[-1]['result'].received + DECISION_SETTLE_TIME  # Free flow - wait until the plate has settled
+
+    if lane.params.lpr.selectedDecision == SelectedDecision.FIRST.value:  # Select first, middle og last decision image
+        i = 0
+    elif lane.params.lpr.selectedDecision == SelectedDecision.MIDDLE.value:
+        i = math.ceil((len(best) / 2))
+    else:
+        i = len(best) - 1
+
+    make_decision(lane, best, i)
+    return 0.0
+
+
+def make_decision(lane: Lane, best: list, i: int) -> None:
+    global DEV_PARAMS, CAM_PARAMS
+
+    result: Result = best[i]['result']  # Set best result
+    if result.plate not in lane.ignored.copy():  # The license plate should not be ignored
+        log(LogType.DEBUG, 'make_decision', f'decisions: {len(best)}, selected index: {i}')
+        plate, texts = track_plate(lane, result)  # Voted text when the tracker is enabled
+        lane.ignored[result.plate] = time.monotonic()  # Start of the blocking time
+        lane.ignoredText[result.plate] = plate
+
+        image = best[i]['image']  # Set decision image
+        rectangle = Rectangle(result.box)  # Set plate rectangle
+
+        fullImage = None
+        include, idx = include_full_image(lane)
+        if not include:
+            pass
+        elif idx <= 0:
+            i = len(lane.videoBuffer) - abs(idx)
+            if len(lane.videoBuffer) >= i:
+                frame = cv2.cvtColor(lane.videoBuffer[i - 1], cv2.COLOR_BGR2GRAY)
+                _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
+                fullImage = b64encode(encoded.tobytes()).decode('ascii')
+
+        if lane.params.lpr.cropDecision.width > 0 and lane.params.lpr.cropDecision.height > 0:  # Crop decision image
+            decode = cv2.imdecode(image, cv2.IMREAD_UNCHANGED)
+            rtn, rectangle, cropped = crop_image(decode, rectangle, lane.params.lpr.cropDecision.width, lane.params.lpr.cropDecision.height)
+            if rtn:  # Crop success
+                rtn, image = cv2.imencode('.jpg', cropped, [cv2.IMWRITE_JPEG_QUALITY, CAM_PARAMS.videoStream.compression])
+            else:  # Cropping failed
+                image = best[i]['image']
+                rectangle = Rectangle(result.box)
+                log(LogType.WARNING, 'make_decision', 'Cropping failed')
+
+        # Create new DECISION
+        decision = Decision(DEV_PARAMS.device.address, str(uuid.uuid4()), result.timestamp,
+                            plate, 'both', result.score, result.dScore, rectangle, 0,
+                            result.region, result.vehicle, result.candidates,
+                            b64encode(image.tobytes()).decode('ascii'), fullImage, lane=lane.index)
+
+        append_decision(dict(pending=True, delete=False, index=0, id=[], lane=lane.index, data=decision, result=result, texts=texts))  # Event based decisions
+
+
+def schedule_timer(lane: Lane, deadline: float, kind: str, key: str, ref=None) -> None:
+    with lane.timerLock:
+        lane.timerSeq += 1
+        heapq.heappush(lane.timers, (deadline, lane.timerSeq, kind, key, ref))  # Min-heap on monotonic deadlines
+
+
+def evaluate_plate(lane: Lane, plate: str, now: float) -> None:
+    lane.decisionTimers.pop(plate, None)
+    due = decide_plate(lane, plate, now)
+    if due > 0:
+        lane.decisionTimers[plate] = due
+        schedule_timer(lane, due, 'settle', plate, due)
+
+
+def release_plate(lane: Lane, plate: str, now: float) -> None:
+    if plate_in_readings(lane, plate):
+        pass
+    elif plate in lane.ignored:
+        lane.ignored[plate] = now  # Plate has left the readings - start the blocking time
+        schedule_timer(lane, now + lane.params.lpr.plateBlockingTime, 'ignored', plate, now)
+    else:
+        lane.plates.pop(plate, None)  # Plate was never decided and has left the readings
+
+
+def expire_timers(lane: Lane, now: float) -> None:
+    global DIRECTION_POINT_AGE
+
+    while True:
+        with lane.timerLock:
+            if len(lane.timers) == 0 or lane.timers[0][0] > now:
+                break
+            deadline, _, kind, key, ref = heapq.heappop(lane.timers)
+
+        if kind == 'result':  # Timer have expired for max. time a Result can stay in the buffer - remove it
+            rd, re = ref
+            if re in rd.results:
+                unindex_result(lane, rd, re)
+                release_plate(lane, key, now)
+
+        elif kind == 'settle':  # Plate has had no new readings for the settle time
+            if lane.decisionTimers.get(key) == ref:
+                evaluate_plate(lane, key, now)
+
+        elif kind == 'ignored':  # Blocking time of a decided plate
+            if lane.ignored.get(key) != ref or plate_in_readings(lane, key):
+                pass  # Plate has been seen again - a new timer starts when it leaves the readings
+            elif now >= ref + lane.params.lpr.plateBlockingTime:
+                lane.ignored.pop(key, None)  # Timer have expired for ignored license plate - remove it
+                lane.ignoredText.pop(key, None)
+                lane.plates.pop(key, None)
+            else:
+                schedule_timer(lane, ref + lane.params.lpr.plateBlockingTime, kind, key, ref)  # Blocking time was changed
+
+        elif kind == 'direction':  # Direction track of a plate that is no longer seen
+            if lane.directions.get(key) is not ref:
+                pass
+            elif now >= ref.seen + DIRECTION_POINT_AGE:
+                lane.directions.pop(key, None)
+            else:
+                schedule_timer(lane, ref.seen + DIRECTION_POINT_AGE, kind, key, ref)
+
+        elif kind == 'track':  # Box track without new results
+            if now >= ref.seen + lane.params.lpr.trackerMaxAge:
+                lane.boxTracks.pop(key, None)
+            else:
+                schedule_timer(lane, ref.seen + lane.params.lpr.trackerMaxAge, kind, key, ref)
+
+
+def next_decision_time(lane: Lane) -> float:
+    with lane.timerLock:
+        return lane.timers[0][0] if len(lane.timers) > 0 else time.monotonic() + 1.0
+
+
+def signal_decision(lane: Lane, plates: list) -> None:
+    lane.decisionPlates.update(plates)
+    lane.decisionSignal.set()  # Wake up the decision thread
+
+
+def do_make_decision(lane: Lane) -> None:
+    global STARTED
+
+    while STARTED:
+        try:
+            delay = min(max(next_decision_time(lane) - time.monotonic(), 0.001), 1.0)
+            lane.decisionSignal.wait(timeout=delay)  # Wait for a new reading or the next due timer
+            lane.decisionSignal.clear()  # Readings signalled from now on wake up the next wait
+
+            while len(lane.deliveries) > 0:
+                apply_reading(lane, lane.deliveries.pop(0))  # New readings in capture order
+
+            now = time.monotonic()
+            while len(lane.decisionPlates) > 0:
+                evaluate_plate(lane, lane.decisionPlates.pop(), now)  # Evaluate only plates with new readings
+            expire_timers(lane, now)
 
         except Exception as e:
             log(LogType.NETWORK, 'do_make_decision', e)
 
-    GPIO.setDigital(DIO.IR, 0)
-    GPIO.setDigital(DIO.FAN, 0)
-    GPIO.setDigital(DIO.RUN, 0)
-    GPIO.setDigital(DIO.PLATE, 0)
-    GPIO.setDigital(DIO.WARN, 0)
-    GPIO.setDigital(DIO.OUT1, 0)
-    GPIO.setDigital(DIO.OUT2, 0)
-    GYRO.close()
-    BOARD.close()
-
 
 def do_command_socket(port: int) -> None:
     async def on_connect(server, path):
-        global STARTED, DEV_PARAMS, CAM_PARAMS, WATCHDOG, NEW_PLATE, READINGS, WHITELIST, BLACKLIST, IGNORELIST
+        global STARTED, DEV_PARAMS, CAM_PARAMS, WATCHDOG, NEW_PLATE, LANES, WHITELIST, BLACKLIST, IGNORELIST
 
         while STARTED:
             try:
@@ -2311,9 +3203,29 @@ def do_command_socket(port: int) -> None:
                     cam = CAM_PARAMS.camera
                     CAM_PARAMS = Pykson().from_json(cmd[16:], CameraParameters, accept_unknown=True)
                     CAM_PARAMS.camera.changed = not CAM_PARAMS.camera.__eq__(cam)
+                    LANES[0].params = CAM_PARAMS
+                    share_device_parameters()  # Lanes 1..n follow the new device settings
                     save_cam_parameters()
                     await server.send('<ACK>')
 
+                elif cmd.startswith('<GET_LANE_PARAMS:') and cmd.find('>') > 17:  # <GET_LANE_PARAMS:1>
+                    e = cmd.find('>')
+                    index = int(cmd[17:e])
+                    await server.send(cmd[:e + 1] + read_lane_parameters(index))
+
+                elif cmd.startswith('<SET_LANE_PARAMS:') and cmd.find('>') > 17:  # <SET_LANE_PARAMS:1>{...}
+                    e = cmd.find('>')
+                    index = int(cmd[17:e])
+                    if 0 < index <= len(LANES):
+                        new = index == len(LANES)
+                        save_lane_parameters(index, cmd[e + 1:])
+                        load_lane_parameters(index)
+                        if new and index < len(LANES) and INIT:  # New lane - start its pipeline
+                            start_lane(LANES[index])
+                        await server.send('<ACK>')
+                    else:
+                        await server.send('<NAK>')
+
                 elif cmd.startswith('<GET_BLACKLIST>'):  # <GET_BLACKLIST>
                     load_blacklist()
                     await server.send(cmd + '|'.join(BLACKLIST))
@@ -2401,12 +3313,11 @@ def do_command_socket(port: int) -> None:
                         await server.send('<NAK>')
 
                 elif cmd.startswith('<GET_RESULT>'):
-                    if len(FRAME_BUFFER) > 2:
-                        frame = FRAME_BUFFER[2]
-                        rtn, status, js = platerecognizer_recognize(frame)
+                    frame = get_stream_frame(LANES[0])
+                    if frame is not None:
+                        rtn, status, reading = platerecognizer_recognize(LANES[0], frame)
                         if rtn:
-                            reading = Pykson().from_json(js, PlateReaderResult, accept_unknown=True)
-                            value = Pykson().to_json(reading)
+                            value = reading.to_json()
                             n = len(value) - 1
                             encoded = b64encode(frame.tobytes()).decode('ascii')
                             image = f', "image": "{encoded}"'
@@ -2424,21 +3335,17 @@ def do_command_socket(port: int) -> None:
                         await server.send(res)
                     else:
                         plate = str(cmd[13:e])
-                        for rd in READINGS.copy():
-                            for re in rd.results:
-                                if re.plate == plate:
-                                    value = Pykson().to_json(rd)
-                                    n = len(value) - 1
-                                    encoded = b64encode(rd.frame['image'].tobytes()).decode('ascii')
-                                    image = f', "image": "{encoded}"'
-                                    value = value[:n] + image + value[n:]
-                                    res = cmd + value
-                                    break
-                                else:
-                                    continue
-                            else:
-                                continue
-                            break
+                        for lane in LANES.copy():
+                            results = text_results(lane, plate)
+                            if len(results) > 0:
+                                rd = results[0][0]  # Oldest reading of the plate
+                                value = rd.to_json()
+                                n = len(value) - 1
+                                encoded = b64encode(rd.frame['image'].tobytes()).decode('ascii')
+                                image = f', "image": "{encoded}"'
+                                value = value[:n] + image + value[n:]
+                                res = cmd + value
+                                break
                         await server.send(res)
 
                 elif cmd.startswith('<GET_NEW_PLATE>'):  # <GET_NEW_PLATE>
@@ -2462,18 +3369,32 @@ def do_command_socket(port: int) -> None:
 
 def do_stream_socket(port: int) -> None:
     async def on_connect(server, path):
-        global STARTED, FRAME_BUFFER
+        global STARTED, LANES
 
         while STARTED:
             try:
                 cmd = await server.recv()
                 if cmd == '<GET_FRAME>':
-                    if len(FRAME_BUFFER) > 2:
-                        txt = '<GET_FRAME>' + b64encode(FRAME_BUFFER[2].tobytes()).decode('ascii')
+                    encoded = get_stream_frame(LANES[0])
+                    if encoded is not None:
+                        txt = '<GET_FRAME>' + b64encode(encoded.tobytes()).decode('ascii')
                         await server.send(txt)
                     else:
                         await server.send('<NUL>')
 
+                elif cmd.startswith('<GET_FRAME:') and cmd.endswith('>') and cmd[11:-1].isnumeric():  # <GET_FRAME:1>
+                    lanes = LANES.copy()
+                    index = int(cmd[11:-1])
+                    if index >= len(lanes):
+                        await server.send('<NAK>')  # Unknown lane. No fallback to lane 0
+                    else:
+                        encoded = get_stream_frame(lanes[index])
+                        if encoded is not None:
+                            txt = cmd + b64encode(encoded.tobytes()).decode('ascii')
+                            await server.send(txt)
+                        else:
+                            await server.send('<NUL>')
+
                 else:
                     await server.send('<NAK>')
             except websockets.WebSocketException as e:
@@ -2490,7 +3411,7 @@ def do_stream_socket(port: int) -> None:
 
 def do_web_socket(port: int) -> None:
     async def on_connect(server, path):
-        global STARTED, DEV_PARAMS, CAM_PARAMS, FRAME_BUFFER
+        global STARTED, DEV_PARAMS, CAM_PARAMS, LANES
         # print('ws connected')
         while STARTED:
             try:
@@ -2502,8 +3423,9 @@ def do_web_socket(port: int) -> None:
                 elif cmd == '<GET_CAM_PARAMS>':
                     await server.send('CAM:' + Pykson().to_json(CAM_PARAMS))
                 elif cmd == '<GET_FRAME>':
-                    if len(FRAME_BUFFER) > 2:
-                        txt = 'FRAME:' + b64encode(FRAME_BUFFER[2].tobytes()).decode('ascii')
+                    encoded = get_stream_frame(LANES[0])
+                    if encoded is not None:
+                        txt = 'FRAME:' + b64encode(encoded.tobytes()).decode('ascii')
                         await server.send(txt)
                 else:
                     await server.send('<NAK>')
@@ -2522,10 +3444,10 @@ def do_web_socket(port: int) -> None:
 
 
 def get_docker_status() -> str:
-    global STARTED
+    global STARTED, SDK_EXTERNAL
 
-    if platform.system() == 'Windows':
-        return 'N/A'
+    if platform.system() == 'Windows' or SDK_EXTERNAL:
+        return 'N/A'  # Counts as running
 
     try:
         containers = []
@@ -2541,9 +3463,9 @@ def get_docker_status() -> str:
 
 
 def await_docker_status() -> bool:
-    global STARTED, DEV_PARAMS, GPIO
+    global STARTED, DEV_PARAMS, GPIO, SDK_EXTERNAL
 
-    if platform.system() == 'Windows':
+    if platform.system() == 'Windows' or SDK_EXTERNAL:
         return True
 
     stopped = 0
@@ -2603,13 +3525,25 @@ def await_docker_status() -> bool:
     return result
 
 
+def start_lane(lane: Lane) -> None:
+    global RECOGNITION_LOOP
+
+    thread.start_new_thread(do_poll_camera, (lane,))
+    if RECOGNITION_LOOP is not None:
+        start_recognition(RECOGNITION_LOOP, lane)  # Lane added while running
+    if lane.index > 0:
+        thread.start_new_thread(do_make_decision, (lane,))  # Lane 0 decisions are made in the main thread
+    log(LogType.DEBUG, 'start_lane', f'{lane}: [{lane.params.camera.address}] STARTED')
+
+
 def init(version: str) -> None:
-    global INIT, DEV_PARAMS, TRIGGERS, BOARD, GPIO, GYRO, EXCEL_BUSY, DIO
+    global INIT, DEV_PARAMS, LANES, BOARD, GPIO, GYRO, EXCEL_BUSY, DIO
 
     clear_terminal()
     create_folders()
     load_dev_parameters()
     load_cam_parameters()
+    load_lanes()
     load_blacklist()
     load_whitelist()
     load_ignorelist()
@@ -2663,11 +3597,21 @@ def init(version: str) -> None:
 
     if await_docker_status():
         INIT = True
-        TRIGGERS = [thread.allocate_lock(), thread.allocate_lock()]
-        thread.start_new_thread(do_poll_camera, ())
-        thread.start_new_thread(do_process_image, ())
+        for lane in LANES.copy():
+            start_lane(lane)
+        thread.start_new_thread(do_recognition, ())
         log(LogType.DEBUG, 'init', f'YOLOCAM V{DEV_PARAMS.device.firmware} STARTED')
-        do_make_decision()
+        do_make_decision(LANES[0])
+
+        GPIO.setDigital(DIO.IR, 0)
+        GPIO.setDigital(DIO.FAN, 0)
+        GPIO.setDigital(DIO.RUN, 0)
+        GPIO.setDigital(DIO.PLATE, 0)
+        GPIO.setDigital(DIO.WARN, 0)
+        GPIO.setDigital(DIO.OUT1, 0)
+        GPIO.setDigital(DIO.OUT2, 0)
+        GYRO.close()
+        BOARD.close()
 
     while EXCEL_BUSY:
         sleep(1.0)
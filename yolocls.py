@@ -1,4 +1,5 @@
 import _thread as thread
+import threading
 import os
 import json
 import struct
@@ -7,6 +8,13 @@ from datetime import datetime
 from time import sleep
 from ctypes import *
 from enum import Enum
+import aiohttp
+import cv2
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
 from pykson import JsonObject, IntegerField, FloatField, StringField, BooleanField, ObjectField, ObjectListField, ListField
 
 
@@ -88,6 +96,23 @@ class DirectionType(Enum):
     unknown = 4
 
 
+class CaptureMode(Enum):
+    READ = 0
+    GRAB = 1
+
+
+class CaptureBackend(Enum):
+    DEFAULT = 0
+    FFMPEG = 1
+    GSTREAMER = 2
+
+
+class BreakerState(Enum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
 class IrLightType(Enum):
     OFF = 0
     ON = 1
@@ -149,11 +174,43 @@ class Position(JsonObject):
         return f'x={self.x}, y={self.y}, z={self.z}'
 
 
-class Box(JsonObject):
-    xMin = IntegerField(default_value=0, serialized_name="xmin")
-    yMin = IntegerField(default_value=0, serialized_name="ymin")
-    xMax = IntegerField(default_value=0, serialized_name="xmax")
-    yMax = IntegerField(default_value=0, serialized_name="ymax")
+def to_float(value: any) -> any:
+    return None if value is None else float(value)
+
+
+def restore_slots(obj: any, state: any) -> dict:
+    obj.__init__()  # Defaults for slots missing in older pickles
+    if isinstance(state, tuple):
+        state = {**(state[0] or {}), **(state[1] or {})}  # (dict, slots) state
+    values = {**(state.get('_data') or {}), **state}  # Decisions flushed before __slots__ hold the Pykson dict state
+    slots = {name.lower(): name for name in obj.__slots__}
+    for key, value in values.items():
+        name = slots.get(key.replace('_', '').lower())  # Serialized names like max_calls and dscore
+        if name is not None:
+            setattr(obj, name, value)
+    return values
+
+
+class Box:
+    __slots__ = ('xMin', 'yMin', 'xMax', 'yMax')
+
+    def __init__(self, xMin=0, yMin=0, xMax=0, yMax=0):
+        self.xMin: int = xMin
+        self.yMin: int = yMin
+        self.xMax: int = xMax
+        self.yMax: int = yMax
+
+    @staticmethod
+    def from_dict(value: dict):
+        if value is None:
+            return None
+        return Box(int(value.get('xmin', 0)), int(value.get('ymin', 0)), int(value.get('xmax', 0)), int(value.get('ymax', 0)))
+
+    def to_dict(self) -> dict:
+        return dict(xmin=self.xMin, ymin=self.yMin, xmax=self.xMax, ymax=self.yMax)
+
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
 
 
 class Rectangle:
@@ -184,9 +241,24 @@ class Rectangle:
         return f'[{self.x};{self.y};{self.width};{self.height}]'
 
 
-class Region(JsonObject):
-    score = FloatField(default_value=0.0)
-    code = StringField(default_value='')
+class Region:
+    __slots__ = ('score', 'code')
+
+    def __init__(self, score=0.0, code=''):
+        self.score: float = score
+        self.code: str = code
+
+    @staticmethod
+    def from_dict(value: dict):
+        if value is None:
+            return None
+        return Region(to_float(value.get('score', 0.0)), value.get('code', ''))
+
+    def to_dict(self) -> dict:
+        return dict(score=self.score, code=self.code)
+
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
 
 
 class IrLightControl(JsonObject):
@@ -195,15 +267,45 @@ class IrLightControl(JsonObject):
     currentBrightness = IntegerField(default_value=0)
 
 
-class Usage(JsonObject):
-    calls = IntegerField(default_value=0)
-    maxCalls = IntegerField(default_value=0, serialized_name="max_calls")
+class Usage:
+    __slots__ = ('calls', 'maxCalls')
 
+    def __init__(self, calls=0, maxCalls=0):
+        self.calls: int = calls
+        self.maxCalls: int = maxCalls
 
-class Vehicle(JsonObject):
-    score = FloatField(default_value=0.0)
-    type = StringField(default_value='')
-    box = Box()
+    @staticmethod
+    def from_dict(value: dict):
+        if value is None:
+            return None
+        return Usage(int(value.get('calls', 0)), int(value.get('max_calls', 0)))
+
+    def to_dict(self) -> dict:
+        return dict(calls=self.calls, max_calls=self.maxCalls)
+
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
+
+
+class Vehicle:
+    __slots__ = ('score', 'type', 'box')
+
+    def __init__(self, score=0.0, type='', box=None):
+        self.score: float = score
+        self.type: str = type
+        self.box: Box = box
+
+    @staticmethod
+    def from_dict(value: dict):
+        if value is None:
+            return None
+        return Vehicle(to_float(value.get('score', 0.0)), value.get('type', ''), Box.from_dict(value.get('box')))
+
+    def to_dict(self) -> dict:
+        return dict(score=self.score, type=self.type, box=None if self.box is None else self.box.to_dict())
+
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
 
 
 class DeviceInterface(JsonObject):
@@ -253,6 +355,7 @@ class Status(JsonObject):
     dockerRunning = BooleanField(default_value=False)
     cameraConnected = BooleanField(default_value=False)
     brightnessLevel = IntegerField(default_value=0)
+    sdkBreaker = IntegerField(default_value=0)  # 0=closed, 1=open, 2=half-open
     watchdog = 0
 
 
@@ -260,6 +363,18 @@ class Statistics(JsonObject):
     cameraFramesPerSecond = IntegerField(default_value=0)
     ocrFramesPerSecond = IntegerField(default_value=0)
     decisions = IntegerField(default_value=0)
+    droppedFramesPerSecond = IntegerField(default_value=0)
+    suppressedFrames = IntegerField(default_value=0)
+    duplicateFrames = IntegerField(default_value=0)  # Frames not sent to the SDK because they matched the last empty frame
+    lprFrameRate = FloatField(default_value=0.0)
+    sdkRequests = IntegerField(default_value=0)
+    sdkConnections = IntegerField(default_value=0)  # New SDK connections. The rest of the requests reused a keep-alive connection
+    avgConnectTime = FloatField(default_value=0.0)  # SDK connection setup time in milliseconds, not included in avgLprTime
+    expiredReadings = IntegerField(default_value=0)  # Readings dropped because they arrived after lpr.maxResultAge
+    breakerTransitions = IntegerField(default_value=0)  # SDK circuit breaker state changes
+    breakerRejections = IntegerField(default_value=0)  # Frames not sent to the SDK because the breaker was open
+    cameraReconnects = IntegerField(default_value=0)
+    recoveryTime = FloatField(default_value=0.0)  # Seconds from camera loss to the first new frame
     avgFrameSize = IntegerField(default_value=0)
     minFrameSize = IntegerField(default_value=0)
     maxFrameSize = IntegerField(default_value=0)
@@ -315,6 +430,18 @@ class Camera(JsonObject):
     gamma = FloatField(default_value=0.0)
     gain = FloatField(default_value=0.0)
     irLightControl = ObjectField(IrLightControl)
+    brightnessArea = StringField(default_value='')  # x; y; width; height. Area used for auto brightness, empty=full frame
+    captureMode = IntegerField(default_value=0)  # 0=read and decode every frame, 1=grab every frame and decode on demand
+    captureBackend = IntegerField(default_value=0)  # 0=default, 1=low latency FFmpeg, 2=low latency GStreamer
+    ffmpegOptions = StringField(default_value='rtsp_transport;tcp|fflags;nobuffer|flags;low_delay')
+    gstreamerPipeline = StringField(default_value='rtspsrc location={address} latency=0 ! decodebin ! videoconvert ! appsink max-buffers=1 drop=true sync=false')
+    readTimeout = IntegerField(default_value=5000)  # Milliseconds without a new frame before the camera is reconnected
+    freezeTime = IntegerField(default_value=30)  # Seconds of identical frames before the camera is reconnected. 0=disabled
+    reconnectDelay = FloatField(default_value=1.0)  # First reconnect delay in seconds. Doubled on every failed attempt
+    maxReconnectDelay = FloatField(default_value=30.0)  # Maximum reconnect delay in seconds
+    replaySpeed = FloatField(default_value=1.0)  # file:// address. 1.0=recorded pace, 0=as fast as recognition keeps up
+    replayFrameRate = FloatField(default_value=25.0)  # file:// address. Frame rate of an image directory
+    replayStart = StringField(default_value='2000-01-01 00:00:00.000000')  # file:// address. Timestamp of the first frame
 
     def __eq__(self, obj):
         try:
@@ -359,6 +486,33 @@ class Lpr(JsonObject):
     cropDecision = ObjectField(Size)
     includeFullImage = StringField(default_value='')
     decisionModel = IntegerField(default_value=0)
+    cropMask = BooleanField(default_value=False)  # Send only the bounding box of the image mask to the SDK
+    motionGate = BooleanField(default_value=False)  # Skip recognition when nothing moves inside the image mask
+    motionThreshold = FloatField(default_value=0.5)  # Percent of the image mask area that must change to detect motion
+    motionHoldTime = FloatField(default_value=3.0)  # Seconds recognition continues after the last detected motion
+    duplicateFilter = BooleanField(default_value=False)  # Reuse the last empty reading for frames that look the same
+    duplicateThreshold = IntegerField(default_value=3)  # Max. number of differing bits (of 64) in the frame hash for a duplicate frame
+    duplicateMaxAge = FloatField(default_value=5.0)  # Seconds an empty reading may be reused before the SDK is asked again
+    adaptiveFrameRate = BooleanField(default_value=False)  # Adapt frame rate to SDK capacity and scene activity
+    idleFrameRate = FloatField(default_value=1.0)  # Frame rate when no plates are tracked
+    maxFrameRate = FloatField(default_value=10.0)  # Max. frame rate when plates are tracked
+    inflightRequests = IntegerField(default_value=1)  # Concurrent SDK requests. Readings are still handled in capture order
+    maxResultAge = IntegerField(default_value=5000)  # Milliseconds from capture until a reading is too old to be used. 0=no limit
+    mosaicBatch = BooleanField(default_value=False)  # Pack frames from several lanes into one mosaic image and one SDK request
+    mosaicSize = IntegerField(default_value=4)  # Max. frames in one mosaic. Read from the lane that opens the mosaic
+    mosaicWindow = IntegerField(default_value=20)  # Milliseconds to wait for frames from other lanes. Read from the lane that opens the mosaic
+    blockedFrameRate = FloatField(default_value=0.0)  # Frame rate while only blocked plates stand still in view. 0=disabled
+    blockedTolerance = IntegerField(default_value=20)  # Max. pixels a blocked plate may move and still stand still
+    breakerErrorRate = IntegerField(default_value=50)  # Percent of failed or slow SDK requests that opens the circuit breaker. 0=disabled
+    breakerLatency = IntegerField(default_value=3000)  # Milliseconds before an SDK request counts as slow. 0=no limit
+    breakerWindow = IntegerField(default_value=20)  # Number of recent SDK requests the error rate is measured over
+    breakerOpenTime = FloatField(default_value=2.0)  # Seconds the breaker stays open before a probe. Doubled for every failed probe
+    breakerMaxOpenTime = FloatField(default_value=60.0)  # Max. seconds the breaker stays open
+    degradedFrameRate = FloatField(default_value=1.0)  # Frame rate while the breaker is not closed
+    boxTracker = BooleanField(default_value=False)  # Track plate boxes across frames and decide on the track instead of the OCR text
+    trackerIou = FloatField(default_value=0.3)  # Min. overlap (IoU) of a plate box with the last box of a track
+    trackerDistance = FloatField(default_value=1.5)  # Max. centroid distance in plate widths when the boxes do not overlap
+    trackerMaxAge = FloatField(default_value=2.0)  # Seconds a track is kept without a new result
     deviceInterface = ObjectField(DeviceInterface)
     decisionRecording = DecisionRecording()
     options = ObjectField(LprOptions)
@@ -437,39 +591,99 @@ class DeviceParameters(JsonObject):
     auxiliary = ObjectField(AuxiliaryStatus)
 
 
-class Candidate(JsonObject):
-    score = FloatField(default_value=0.0)
-    plate = StringField(default_value='')
+class Candidate:
+    __slots__ = ('score', 'plate')
+
+    def __init__(self, score=0.0, plate=''):
+        self.score: float = score
+        self.plate: str = plate
+
+    @staticmethod
+    def from_dict(value: dict):
+        return Candidate(to_float(value.get('score', 0.0)), value.get('plate', ''))
 
+    def to_dict(self) -> dict:
+        return dict(score=self.score, plate=self.plate)
 
-class Result(JsonObject):
-    timestamp = StringField(default_value='')
-    plate = StringField(default_value='')
-    box = Box()
-    region = Region()
-    vehicle = Vehicle()
-    score = FloatField()
-    dScore = FloatField(serialized_name="dscore")
-    candidates = ObjectListField(Candidate)
-    passed = False
-    loops = 0
-    expire: float = 0.0
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
 
 
-class PlateReaderResult(JsonObject):
-    filename = StringField(default_value='')
-    timestamp = StringField(default_value='')
-    cameraId = StringField(default_value='', serialized_name="camera_id")
-    error = StringField()
-    results = ObjectListField(Result)
-    usage = Usage()
-    processingTime = FloatField(default_value=0.0, serialized_name="processing_time")
-    frame = None
+class Result:
+    __slots__ = ('timestamp', 'plate', 'text', 'box', 'region', 'vehicle', 'score', 'dScore', 'candidates', 'passed', 'received', 'expire', 'trackId')
+
+    def __init__(self, timestamp='', plate='', box=None, region=None, vehicle=None, score=None, dScore=None, candidates=None):
+        self.timestamp: str = timestamp
+        self.plate: str = plate
+        self.text: str = plate  # Plate text read by the SDK. plate is the key of the box track (#id) when the tracker is enabled
+        self.box: Box = box
+        self.region: Region = region
+        self.vehicle: Vehicle = vehicle
+        self.score: float = score
+        self.dScore: float = dScore
+        self.candidates: list = [] if candidates is None else candidates
+        self.passed = False
+        self.received: float = 0.0  # Time the result was added to the readings buffer
+        self.expire: float = 0.0  # Time the result is removed from the readings buffer
+        self.trackId: int = 0  # Box track of the result. 0=not tracked
+
+    @staticmethod
+    def from_dict(value: dict):
+        return Result(value.get('timestamp', ''), value.get('plate', ''), Box.from_dict(value.get('box')), Region.from_dict(value.get('region')),
+                      Vehicle.from_dict(value.get('vehicle')), to_float(value.get('score')), to_float(value.get('dscore')),
+                      [Candidate.from_dict(c) for c in value.get('candidates') or []])
+
+    def to_dict(self) -> dict:
+        return dict(timestamp=self.timestamp, plate=self.text, box=None if self.box is None else self.box.to_dict(),
+                    region=None if self.region is None else self.region.to_dict(), vehicle=None if self.vehicle is None else self.vehicle.to_dict(),
+                    score=self.score, dscore=self.dScore, candidates=[c.to_dict() for c in self.candidates])
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __setstate__(self, state: any) -> None:
+        if 'text' not in restore_slots(self, state):
+            self.text = self.plate  # Pickled before the box tracker
+
+
+class PlateReaderResult:
+    __slots__ = ('filename', 'timestamp', 'cameraId', 'error', 'results', 'usage', 'processingTime', 'frame')
+
+    def __init__(self, filename='', timestamp='', cameraId='', error=None, results=None, usage=None, processingTime=0.0):
+        self.filename: str = filename
+        self.timestamp: str = timestamp
+        self.cameraId: str = cameraId
+        self.error: str = error
+        self.results: list = [] if results is None else results
+        self.usage: Usage = usage
+        self.processingTime: float = processingTime
+        self.frame = None
+
+    @staticmethod
+    def from_dict(value: dict):
+        return PlateReaderResult(value.get('filename', ''), value.get('timestamp', ''), value.get('camera_id', ''), value.get('error'),
+                                 [Result.from_dict(r) for r in value.get('results') or []], Usage.from_dict(value.get('usage')),
+                                 to_float(value.get('processing_time', 0.0)))
+
+    @staticmethod
+    def from_json(value: any):
+        return PlateReaderResult.from_dict(json.loads(value))  # SDK response bytes are decoded once, without rewriting the text
+
+    def to_dict(self) -> dict:
+        return dict(filename=self.filename, timestamp=self.timestamp, camera_id=self.cameraId, error=self.error, results=[r.to_dict() for r in self.results],
+                    usage=None if self.usage is None else self.usage.to_dict(), processing_time=self.processingTime)
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __setstate__(self, state: any) -> None:
+        restore_slots(self, state)
 
 
 class Decision:
-    def __init__(self, address, guid, timestamp, plate, direction, score, dscore, rectangle, speed, region, vehicle, candidates, image, fullImage=None):
+    def __init__(self, address, guid, timestamp, plate, direction, score, dscore, rectangle, speed, region, vehicle, candidates, image, fullImage=None, lane=0):
         self.address: str = address
+        self.lane: int = lane
         self.id: str = guid
         self.timestamp: str = timestamp
         self.plate: str = plate
@@ -514,6 +728,381 @@ class Decision:
                f'RECT=[{self.x};{self.y};{self.width};{self.height}], ID={self.id}'
 
 
+class Lane:
+    def __init__(self, index: int, params):
+        self.index = index  # Lane number. 0=yolocam.ini, n=yolocam_n.ini
+        self.params = params  # Camera and lpr parameters for the lane
+        self.frameBuffer = []  # Statistics buffer for frame size
+        self.rawBuffer = []  # Ring buffer of raw camera frames, encoded on demand {frame, encoded}
+        self.encodeLock = thread.allocate_lock()  # Lock for on demand frame encoding
+        self.streamTime = 0.0  # Time of the latest video stream request
+        self.maskCache = dict(key=None, mask=None, fill={}, rect=None)  # Compiled image mask {key, mask, fill {shape, image}, rect}
+        self.frameId = 0  # Id of the newest recognition frame
+        self.takenId = 0  # Id of the newest frame taken by a recognition worker
+        self.sequence = 0  # Sequence number of the next SDK request
+        self.delivered = 0  # Sequence number of the next reading to deliver
+        self.results = {}  # Readings waiting for earlier requests to finish {sequence: reading}
+        self.deliveries = []  # Readings in capture order waiting for the decision thread
+        self.resultLock = thread.allocate_lock()  # Lock for taking frames and delivering readings
+        self.loop = None  # Event loop running the recognition of the lane
+        self.frameEvent = None  # Set by the camera thread when a new recognition frame is ready
+        self.pending = {}  # In-flight SDK requests {task: frame timestamp}
+        self.processed = [0, time.time()]  # Processed frames counter [count, time]
+        self.emptyReading = None  # Hash, reading and time of the last reading without plates [hash, reading, time]
+        self.blocked = False  # Only blocked plates stand still in view - recognition runs at blockedFrameRate
+        self.blockedBoxes = {}  # Last box of each blocked plate in view {plate, box}
+        self.blockedProbe = 0.0  # Time of the next motion check while blocked
+        self.replay = None  # Replay source when the camera address is file://
+        self.decisionSignal = threading.Event()  # Set when new readings need a decision
+        self.decisionPlates = set()  # Plates with new readings since the last evaluation
+        self.decisionTimers = {}  # Time a plate is evaluated again {plate, time}
+        self.timers = []  # Heap of expiry timers on monotonic time [(deadline, seq, kind, key, ref)]
+        self.timerSeq = 0  # Tie breaker for timers with the same deadline
+        self.timerLock = thread.allocate_lock()  # Lock for the timer heap
+        self.readings = []  # Readings buffer
+        self.plateIndex = {}  # Results in the readings buffer by plate {plate, [(reading, result)]}
+        self.indexLock = thread.allocate_lock()  # Lock for changing the plate index
+        self.plates = {}  # Accepted plate buffer {plate, count}
+        self.ignored = {}  # Ignored plate buffer {plate, expired}
+        self.ignoredText = {}  # Decided plate text of each ignored plate or box track {plate, text}
+        self.directions = {}  # Direction control {plate, Track}
+        self.boxTracks = {}  # Plate boxes tracked across frames {id, BoxTrack}
+        self.trackSeq = 0  # Id of the newest box track
+        self.postBuffer = []  # Video buffer for frames after a decision is made
+        self.videoBuffer = []  # Video buffer to record live decision
+        self.connected = False  # Camera is connected
+        self.cameraFramesPerSecond = 0
+        self.ocrFramesPerSecond = 0
+        self.droppedFramesPerSecond = 0
+        self.lprFrameRate = 0.0
+
+    def __str__(self):
+        return f'LANE {self.index}'
+
+
+class FrameGrabber:
+    def __init__(self, capture, timeout=1.0):
+        self._capture = capture
+        self.timeout = timeout  # Seconds grab() waits for a new frame
+        self._signal = thread.allocate_lock()  # Released when a new frame is read
+        self._signal.acquire()
+        self._frame = None
+        self.running = capture.isOpened()
+        self.index = 0  # Sequence number of the newest frame
+        self.retrieved = 0  # Sequence number of the last frame handed to the reader
+        self.dropped = 0  # Stale frames that were replaced before the reader took them
+        self._stopped = None  # Released by the monitor thread when it has released the capture
+        if self.running:
+            self._stopped = thread.allocate_lock()
+            self._stopped.acquire()
+            thread.start_new_thread(self.__monitor, ())
+
+    def __getattr__(self, name):
+        return getattr(self._capture, name)  # set, get, isOpened, getBackendName...
+
+    def grab(self, timeout=None) -> bool:
+        if not self._signal.acquire(timeout=self.timeout if timeout is None else timeout):
+            return False  # No new frame within timeout
+        index = self.index
+        self.dropped += max(index - self.retrieved - 1, 0)
+        self.retrieved = index
+        return self._frame is not None
+
+    def retrieve(self) -> (bool, any):
+        frame = self._frame
+        return frame is not None, frame
+
+    def read(self) -> (bool, any):
+        if self.grab():
+            return self.retrieve()
+        else:
+            return False, None
+
+    def release(self) -> None:
+        self.running = False
+        if self._stopped is None:
+            self._capture.release()
+        else:
+            self._stopped.acquire(timeout=self.timeout + 1.0)  # The monitor releases the capture when it has left read()
+
+    def __monitor(self) -> None:
+        err = 0
+        while self.running:
+            rtn, frame = self._capture.read()  # Keep reading so only the newest frame is buffered
+            if rtn:
+                err = 0
+                self._frame = frame
+                self.index += 1
+            else:
+                err += 1
+                self._frame = None
+                sleep(0.01)
+
+            if (rtn or err > 25) and self._signal.locked():
+                self._signal.release()  # Signal new frame or read error to the reader
+
+        self._capture.release()  # Never release while another thread is inside read()
+        self._stopped.release()
+
+
+class Track:
+    def __init__(self, size=64):
+        self.xy = np.zeros((size, 2), dtype=np.int64)  # Plate positions, ring buffer
+        self.ts = np.zeros(size, dtype=np.float64)  # Plate timestamps, ring buffer
+        self.start = 0  # Ring index of the oldest point
+        self.count = 0  # Number of points
+        self.seen = 0.0  # Monotonic time the plate was last seen
+
+    def __len__(self):
+        return self.count
+
+    def append(self, x: int, y: int, ts: float) -> None:
+        size = len(self.ts)
+        if self.count == size:  # Full - double the size and unroll the ring
+            points, times = self.points()
+            self.xy = np.zeros((size * 2, 2), dtype=np.int64)
+            self.ts = np.zeros(size * 2, dtype=np.float64)
+            self.xy[:size], self.ts[:size], self.start = [points, times, 0]
+            size *= 2
+        i = (self.start + self.count) % size
+        self.xy[i] = (x, y)
+        self.ts[i] = ts
+        self.count += 1
+
+    def trim(self, oldest: float) -> None:
+        while self.count > 1 and self.ts[self.start] < oldest:  # Drop points older than oldest
+            self.start = (self.start + 1) % len(self.ts)
+            self.count -= 1
+
+    def points(self) -> (any, any):
+        index = (self.start + np.arange(self.count)) % len(self.ts)
+        return self.xy[index], self.ts[index]  # Oldest point first
+
+
+class BoxTrack:
+    def __init__(self, id: int, box: Box, seen: float):
+        self.id = id
+        self.plate = f'#{id}'  # Key of the track in plates, ignored and directions. Never equal to a plate text
+        self.box = box  # Last plate box
+        self.seen = seen  # Monotonic time of the last result
+        self.votes = {}  # Text votes {text, score}
+
+    def vote(self, text: str, score: float) -> None:
+        self.votes[text] = self.votes.get(text, 0.0) + (1.0 if score is None else score)
+
+    def ranked(self) -> list:
+        votes = self.votes.copy()
+        return sorted(votes, key=votes.get, reverse=True)  # Texts by score sum, highest first
+
+
+class ReplaySource:
+    def __init__(self, path: str, speed=1.0, frameRate=25.0, start=0.0):
+        self.path = path  # Video file or directory of images
+        self.speed = speed  # 1.0=recorded pace, 0=as fast as possible
+        self.start = start  # Timestamp of the first frame
+        self.index = 0  # Frames read
+        self.finished = False  # All frames have been read
+        self.started = time.time()  # Wall clock time of the first frame
+        self.decisions = 0
+        self._file = None
+        if os.path.isdir(path):
+            self.files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')))
+            self._capture = None
+            self.frameRate = frameRate
+        else:
+            self.files = []
+            self._capture = cv2.VideoCapture(path)
+            fps = self._capture.get(cv2.CAP_PROP_FPS)
+            self.frameRate = fps if 0 < fps < 1000 else frameRate
+
+    @property
+    def timestamp(self) -> float:
+        return self.start + max(self.index - 1, 0) / self.frameRate  # Recorded time of the current frame
+
+    def isOpened(self) -> bool:
+        return len(self.files) > 0 if self._capture is None else self._capture.isOpened()
+
+    def getBackendName(self) -> str:
+        return 'REPLAY'
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self.frameRate
+        elif prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.index)
+        elif prop == cv2.CAP_PROP_FRAME_COUNT and self._capture is None:
+            return float(len(self.files))
+        return 0.0 if self._capture is None else self._capture.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return False  # Recorded frames have fixed camera settings
+
+    def grab(self) -> bool:
+        if self._capture is None:
+            rtn = self.index < len(self.files)
+            self._file = self.files[self.index] if rtn else None
+        else:
+            rtn = self._capture.grab()
+        if not rtn:
+            self.finished = True
+            return False
+
+        if self.index == 0:
+            self.started = time.time()
+        self.index += 1
+        if self.speed > 0:  # Keep the recorded pace
+            delay = self.started + (self.index - 1) / self.frameRate / self.speed - time.time()
+            if delay > 0:
+                sleep(delay)
+        return True
+
+    def retrieve(self) -> (bool, any):
+        if self._capture is None:
+            frame = cv2.imread(self._file)
+            return frame is not None, frame
+        return self._capture.retrieve()
+
+    def read(self) -> (bool, any):
+        if self.grab():
+            return self.retrieve()
+        else:
+            return False, None
+
+    def release(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+
+
+class SdkClient:
+    def __init__(self, timeout=(2.0, 10.0), size=8):
+        self.timeout = timeout  # Connect and read timeout in seconds
+        self.size = size  # Max. pooled connections
+        self.requests = 0  # Requests sent
+        self.connections = 0  # New TCP connections. Requests - connections = reused connections
+        self.connectTimes = []  # Connection setup time in milliseconds
+        client = self
+
+        class Connection(HTTPConnection):
+            def connect(self):
+                start = time.time()
+                super().connect()
+                client.connections += 1
+                client.connectTimes.insert(0, (time.time() - start) * 1000)
+                del client.connectTimes[30:]
+
+        class ConnectionPool(HTTPConnectionPool):
+            ConnectionCls = Connection
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0)
+        adapter.poolmanager.pool_classes_by_scheme = dict(adapter.poolmanager.pool_classes_by_scheme, http=ConnectionPool)
+        self._session = requests.Session()  # Keep-alive connections are reused between requests
+        self._session.mount('http://', adapter)
+        self._asyncSession = None  # aiohttp session for the recognition event loop
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        self.requests += 1
+        return self._session.get(url, timeout=kwargs.pop('timeout', self.timeout), **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        self.requests += 1
+        return self._session.post(url, timeout=kwargs.pop('timeout', self.timeout), **kwargs)
+
+    def close(self) -> None:
+        self._session.close()
+
+    async def post_async(self, url: str, data: dict, files: dict, headers: dict) -> (int, bytes):
+        if self._asyncSession is None or self._asyncSession.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_start.append(self.__connect_start)
+            trace.on_connection_create_end.append(self.__connect_end)
+            timeout = aiohttp.ClientTimeout(total=None, connect=self.timeout[0], sock_read=self.timeout[1])
+            connector = aiohttp.TCPConnector(limit=self.size, keepalive_timeout=60.0)
+            self._asyncSession = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace])  # Session belongs to the running event loop
+
+        form = aiohttp.FormData()
+        for name, value in data.items():
+            form.add_field(name, str(value))
+        for name, value in files.items():
+            form.add_field(name, value, filename=name)
+
+        self.requests += 1
+        async with self._asyncSession.post(url, data=form, headers=headers) as response:
+            return response.status, await response.read()
+
+    async def close_async(self) -> None:
+        if self._asyncSession is not None:
+            await self._asyncSession.close()
+
+    async def __connect_start(self, session, context, params) -> None:
+        context.start = time.time()
+
+    async def __connect_end(self, session, context, params) -> None:
+        self.connections += 1
+        self.connectTimes.insert(0, (time.time() - context.start) * 1000)
+        del self.connectTimes[30:]
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.state = BreakerState.CLOSED.value
+        self.outcomes = []  # Recent SDK requests, newest first. True=failed or slow
+        self.openTime = 0.0  # Seconds the breaker stays open
+        self.openUntil = 0.0  # Time of the next probe
+        self.probeTime = 0.0  # Time the half-open probe was sent
+        self.probe = 0  # Id of the half-open probe. Only its result closes or opens the breaker
+        self.transitions = 0
+        self.lock = thread.allocate_lock()
+
+    def allow(self, lpr) -> (bool, int):
+        with self.lock:
+            if lpr.breakerErrorRate <= 0 or self.state == BreakerState.CLOSED.value:
+                return True, 0
+            elif self.state == BreakerState.OPEN.value and time.time() < self.openUntil:
+                return False, 0
+            elif self.state == BreakerState.HALF_OPEN.value and time.time() - self.probeTime < self.openTime + 10.0:
+                return False, 0  # Probe is still running
+            self.state = BreakerState.HALF_OPEN.value  # Let one probe through
+            self.probeTime = time.time()
+            self.probe += 1
+            self.transitions += 1
+            return True, self.probe
+
+    def cancel(self, probe: int) -> None:
+        with self.lock:
+            if probe > 0 and probe == self.probe and self.state == BreakerState.HALF_OPEN.value:
+                self.state, self.openUntil = [BreakerState.OPEN.value, time.time()]  # Probe was cancelled - probe again with the next frame
+                self.transitions += 1
+
+    def record(self, lpr, failed: bool, latency: float, probe=0) -> bool:
+        failed = failed or 0 < lpr.breakerLatency < latency
+        with self.lock:
+            state = self.state
+            if lpr.breakerErrorRate <= 0:
+                self.state, self.outcomes, self.openTime = [BreakerState.CLOSED.value, [], 0.0]
+            elif self.state == BreakerState.HALF_OPEN.value:
+                if not probe == self.probe:
+                    pass  # Request was sent before the breaker opened
+                elif failed:
+                    self.__open(lpr)
+                else:
+                    self.state, self.outcomes, self.openTime = [BreakerState.CLOSED.value, [], 0.0]
+            elif self.state == BreakerState.CLOSED.value:
+                self.outcomes.insert(0, failed)
+                del self.outcomes[max(lpr.breakerWindow, 1):]
+                count = len(self.outcomes)
+                if count >= max(lpr.breakerWindow, 1) / 2 and 100 * sum(self.outcomes) / count >= lpr.breakerErrorRate:
+                    self.__open(lpr)
+            if state != self.state:
+                self.transitions += 1
+            return state != self.state
+
+    def __open(self, lpr) -> None:
+        self.openTime = min(max(self.openTime * 2, lpr.breakerOpenTime), lpr.breakerMaxOpenTime)
+        self.openUntil = time.time() + self.openTime
+        self.state = BreakerState.OPEN.value
+        self.outcomes = []
+
+
 class GHF51:
     def __init__(self, direction=None, negate=0b00000000, path='/home/cam/libEAPI_Library.so'):
         # https://stackoverflow.com/questions/26363641/passing-a-pointer-value-to-a-c-function-from-python
@@ -18,17 +18,17 @@ sudo apt install python3-opencv
 #INSTALL OTHER MODULES:
 pip3 install pykson --user
 pip3 install websockets --user
-pip3 install Pillow --user
 pip3 install netaddr --user
 pip3 install openpyxl --user
+pip3 install aiohttp --user
 
 #INSTALL SAME MODULES TO RUN UNDER A DEMON:
 sudo -H python3 -m pip install opencv-python
 sudo -H python3 -m pip install pykson
 sudo -H python3 -m pip install websockets
-sudo -H python3 -m pip install Pillow
 sudo -H python3 -m pip install netaddr
 sudo -H python3 -m pip install openpyxl
+sudo -H python3 -m pip install aiohttp
 
 #INSTALL V4L VIDEO UTILITY:
 sudo apt install v4l-utils